@@ -0,0 +1,199 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('role', sa.Enum('ADMIN', 'COACH', 'ATHLETE', name='userrole'), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('coach_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['coach_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('exercises',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('muscle_group', sa.String(), nullable=False),
+    sa.Column('video_url', sa.String(), nullable=True),
+    sa.Column('created_by_user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_exercises_id'), 'exercises', ['id'], unique=False)
+    op.create_table('nutrition_plans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('total_calories', sa.Float(), nullable=True),
+    sa.Column('total_protein', sa.Float(), nullable=True),
+    sa.Column('total_carbs', sa.Float(), nullable=True),
+    sa.Column('total_fats', sa.Float(), nullable=True),
+    sa.Column('created_by_user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_nutrition_plans_id'), 'nutrition_plans', ['id'], unique=False)
+    op.create_table('plans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('difficulty_level', sa.Enum('BEGINNER', 'INTERMEDIATE', 'ADVANCED', name='plandifficulty'), nullable=False),
+    sa.Column('created_by_user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_plans_id'), 'plans', ['id'], unique=False)
+    op.create_table('meals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nutrition_plan_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('time', sa.String(), nullable=False),
+    sa.Column('order_in_plan', sa.Integer(), nullable=False),
+    sa.Column('total_calories', sa.Float(), nullable=True),
+    sa.Column('total_protein', sa.Float(), nullable=True),
+    sa.Column('total_carbs', sa.Float(), nullable=True),
+    sa.Column('total_fats', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['nutrition_plan_id'], ['nutrition_plans.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_meals_id'), 'meals', ['id'], unique=False)
+    op.create_table('nutrition_plan_assignments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nutrition_plan_id', sa.Integer(), nullable=False),
+    sa.Column('athlete_id', sa.Integer(), nullable=False),
+    sa.Column('assigned_by_coach_id', sa.Integer(), nullable=False),
+    sa.Column('assigned_date', sa.DateTime(), nullable=True),
+    sa.Column('start_date', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_by_coach_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['athlete_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['nutrition_plan_id'], ['nutrition_plans.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_nutrition_plan_assignments_id'), 'nutrition_plan_assignments', ['id'], unique=False)
+    op.create_table('plan_assignments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('plan_id', sa.Integer(), nullable=False),
+    sa.Column('athlete_id', sa.Integer(), nullable=False),
+    sa.Column('assigned_by_coach_id', sa.Integer(), nullable=False),
+    sa.Column('assigned_date', sa.DateTime(), nullable=True),
+    sa.Column('start_date', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.Enum('ASSIGNED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED', name='planassignmentstatus'), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_by_coach_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['athlete_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['plan_id'], ['plans.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_plan_assignments_id'), 'plan_assignments', ['id'], unique=False)
+    op.create_table('plan_exercise_details',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('plan_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('sets', sa.String(), nullable=False),
+    sa.Column('reps', sa.String(), nullable=False),
+    sa.Column('rest_time_seconds', sa.Integer(), nullable=False),
+    sa.Column('notes_for_exercise_in_plan', sa.String(), nullable=True),
+    sa.Column('order_in_plan', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ),
+    sa.ForeignKeyConstraint(['plan_id'], ['plans.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_plan_exercise_details_id'), 'plan_exercise_details', ['id'], unique=False)
+    op.create_table('food_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('meal_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('quantity', sa.String(), nullable=False),
+    sa.Column('calories', sa.Float(), nullable=False),
+    sa.Column('protein', sa.Float(), nullable=False),
+    sa.Column('carbs', sa.Float(), nullable=False),
+    sa.Column('fats', sa.Float(), nullable=False),
+    sa.Column('order_in_meal', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['meal_id'], ['meals.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_food_items_id'), 'food_items', ['id'], unique=False)
+    op.create_table('workout_logs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('plan_assignment_id', sa.Integer(), nullable=False),
+    sa.Column('plan_exercise_details_id', sa.Integer(), nullable=False),
+    sa.Column('athlete_id', sa.Integer(), nullable=False),
+    sa.Column('date_performed', sa.DateTime(), nullable=True),
+    sa.Column('sets_performed', sa.Integer(), nullable=False),
+    sa.Column('reps_performed_per_set', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.Column('weight_used_per_set', postgresql.ARRAY(sa.String()), nullable=False),
+    sa.Column('rest_taken_per_set', postgresql.ARRAY(sa.Integer()), nullable=True),
+    sa.Column('athlete_notes', sa.String(), nullable=True),
+    sa.Column('duration_seconds', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['athlete_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['plan_assignment_id'], ['plan_assignments.id'], ),
+    sa.ForeignKeyConstraint(['plan_exercise_details_id'], ['plan_exercise_details.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_workout_logs_id'), 'workout_logs', ['id'], unique=False)
+    op.create_table('personal_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('athlete_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('reps', sa.Integer(), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.Column('date_achieved', sa.Date(), nullable=False),
+    sa.Column('workout_log_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['athlete_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ),
+    sa.ForeignKeyConstraint(['workout_log_id'], ['workout_logs.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('athlete_id', 'exercise_id', 'reps', name='uq_athlete_exercise_reps')
+    )
+    op.create_index(op.f('ix_personal_records_id'), 'personal_records', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_personal_records_id'), table_name='personal_records')
+    op.drop_table('personal_records')
+    op.drop_index(op.f('ix_workout_logs_id'), table_name='workout_logs')
+    op.drop_table('workout_logs')
+    op.drop_index(op.f('ix_food_items_id'), table_name='food_items')
+    op.drop_table('food_items')
+    op.drop_index(op.f('ix_plan_exercise_details_id'), table_name='plan_exercise_details')
+    op.drop_table('plan_exercise_details')
+    op.drop_index(op.f('ix_plan_assignments_id'), table_name='plan_assignments')
+    op.drop_table('plan_assignments')
+    op.drop_index(op.f('ix_nutrition_plan_assignments_id'), table_name='nutrition_plan_assignments')
+    op.drop_table('nutrition_plan_assignments')
+    op.drop_index(op.f('ix_meals_id'), table_name='meals')
+    op.drop_table('meals')
+    op.drop_index(op.f('ix_plans_id'), table_name='plans')
+    op.drop_table('plans')
+    op.drop_index(op.f('ix_nutrition_plans_id'), table_name='nutrition_plans')
+    op.drop_table('nutrition_plans')
+    op.drop_index(op.f('ix_exercises_id'), table_name='exercises')
+    op.drop_table('exercises')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    for enum_name in ('planassignmentstatus', 'plandifficulty', 'userrole'):
+        postgresql.ENUM(name=enum_name).drop(op.get_bind(), checkfirst=True)
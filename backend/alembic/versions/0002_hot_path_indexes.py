@@ -0,0 +1,56 @@
+"""hot path indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_workout_logs_athlete_id_date_performed', 'workout_logs',
+     [sa.text('athlete_id'), sa.text('date_performed DESC'), sa.text('id DESC')]),
+    ('ix_workout_logs_plan_assignment_id', 'workout_logs', ['plan_assignment_id']),
+    ('ix_workout_logs_plan_exercise_details_id', 'workout_logs', ['plan_exercise_details_id']),
+    ('ix_plan_assignments_athlete_id', 'plan_assignments', ['athlete_id']),
+    ('ix_plan_assignments_assigned_by_coach_id', 'plan_assignments', ['assigned_by_coach_id']),
+    ('ix_nutrition_plan_assignments_athlete_id', 'nutrition_plan_assignments', ['athlete_id']),
+    ('ix_nutrition_plan_assignments_assigned_by_coach_id', 'nutrition_plan_assignments',
+     ['assigned_by_coach_id']),
+    ('ix_users_coach_id', 'users', ['coach_id']),
+    ('ix_personal_records_athlete_id_date_achieved', 'personal_records',
+     [sa.text('athlete_id'), sa.text('date_achieved DESC'), sa.text('id')]),
+    ('ix_plans_created_by_user_id', 'plans', ['created_by_user_id']),
+    ('ix_plan_exercise_details_plan_id', 'plan_exercise_details', ['plan_id']),
+    ('ix_nutrition_plans_created_by_user_id', 'nutrition_plans', ['created_by_user_id']),
+    ('ix_meals_nutrition_plan_id', 'meals', ['nutrition_plan_id']),
+    ('ix_food_items_meal_id', 'food_items', ['meal_id']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY avoids locking the tables against writes while building,
+    # but cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table,
+                          postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,122 @@
+"""nutrition totals triggers
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MACROS = ('calories', 'protein', 'carbs', 'fats')
+
+
+def _apply_delta(target: str, parent_key: str, source: str) -> str:
+    """
+    One UPDATE per statement: shifts the totals of every affected parent row by
+    the summed macros of the transition-table rows, so bulk imports cost a
+    single aggregate instead of one update per row.
+    """
+    totals = ', '.join(
+        f'total_{macro} = COALESCE(t.total_{macro}, 0) + d.{macro}' for macro in MACROS)
+    sums = ', '.join(f'SUM({macro}) AS {macro}' for macro in MACROS)
+    changed = ' OR '.join(f'd.{macro} <> 0' for macro in MACROS)
+    return f"""
+        UPDATE {target} AS t SET {totals}
+        FROM (SELECT {parent_key} AS parent_id, {sums} FROM ({source}) AS changes
+              GROUP BY {parent_key}) AS d
+        WHERE t.id = d.parent_id AND ({changed});"""
+
+
+def _rows(table: str, parent_key: str, sign: str, values: str) -> str:
+    return f"SELECT {parent_key}, " + ', '.join(
+        f'{sign}{values.format(macro=macro)} AS {macro}' for macro in MACROS) + f" FROM {table}"
+
+
+def _delta_function(name: str, target: str, parent_key: str, values: str) -> str:
+    inserted = _rows('new_rows', parent_key, '', values)
+    deleted = _rows('old_rows', parent_key, '-', values)
+    return f"""
+    CREATE OR REPLACE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            {_apply_delta(target, parent_key, inserted)}
+        ELSIF TG_OP = 'DELETE' THEN
+            {_apply_delta(target, parent_key, deleted)}
+        ELSE
+            {_apply_delta(target, parent_key, f'{inserted} UNION ALL {deleted}')}
+        END IF;
+        RETURN NULL;
+    END;
+    $$"""
+
+
+RESET_TOTALS_FUNCTION = """
+CREATE OR REPLACE FUNCTION nutrition_totals_reset() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    -- Totals are derived from the food items inserted afterwards
+    NEW.total_calories := 0;
+    NEW.total_protein := 0;
+    NEW.total_carbs := 0;
+    NEW.total_fats := 0;
+    RETURN NEW;
+END;
+$$
+"""
+
+# (trigger name, table, definition)
+TRIGGERS = [
+    ('nutrition_totals_plans_reset', 'nutrition_plans',
+     'BEFORE INSERT ON nutrition_plans FOR EACH ROW EXECUTE FUNCTION nutrition_totals_reset()'),
+    ('nutrition_totals_meals_reset', 'meals',
+     'BEFORE INSERT ON meals FOR EACH ROW EXECUTE FUNCTION nutrition_totals_reset()'),
+    ('nutrition_totals_meals_update', 'meals',
+     'AFTER UPDATE ON meals REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+     'FOR EACH STATEMENT EXECUTE FUNCTION nutrition_totals_from_meals()'),
+    ('nutrition_totals_meals_delete', 'meals',
+     'AFTER DELETE ON meals REFERENCING OLD TABLE AS old_rows '
+     'FOR EACH STATEMENT EXECUTE FUNCTION nutrition_totals_from_meals()'),
+    ('nutrition_totals_food_items_insert', 'food_items',
+     'AFTER INSERT ON food_items REFERENCING NEW TABLE AS new_rows '
+     'FOR EACH STATEMENT EXECUTE FUNCTION nutrition_totals_from_food_items()'),
+    ('nutrition_totals_food_items_update', 'food_items',
+     'AFTER UPDATE ON food_items REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+     'FOR EACH STATEMENT EXECUTE FUNCTION nutrition_totals_from_food_items()'),
+    ('nutrition_totals_food_items_delete', 'food_items',
+     'AFTER DELETE ON food_items REFERENCING OLD TABLE AS old_rows '
+     'FOR EACH STATEMENT EXECUTE FUNCTION nutrition_totals_from_food_items()'),
+]
+
+FUNCTIONS = ('nutrition_totals_reset', 'nutrition_totals_from_meals',
+             'nutrition_totals_from_food_items')
+
+
+def upgrade() -> None:
+    op.execute(RESET_TOTALS_FUNCTION)
+    # Food item changes shift their meal; meal changes (including those made
+    # by the food item trigger) shift their plan.
+    op.execute(_delta_function('nutrition_totals_from_food_items', 'meals', 'meal_id',
+                               'COALESCE({macro}, 0)'))
+    op.execute(_delta_function('nutrition_totals_from_meals', 'nutrition_plans',
+                               'nutrition_plan_id', 'COALESCE(total_{macro}, 0)'))
+    # Created disabled: the application maintains the totals by default.
+    # scripts.bootstrap enables them when NUTRITION_TOTALS_ENGINE=database.
+    for name, table, definition in TRIGGERS:
+        op.execute(f'CREATE TRIGGER {name} {definition}')
+        op.execute(f'ALTER TABLE {table} DISABLE TRIGGER {name}')
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(TRIGGERS):
+        op.execute(f'DROP TRIGGER IF EXISTS {name} ON {table}')
+    for name in FUNCTIONS:
+        op.execute(f'DROP FUNCTION IF EXISTS {name}()')
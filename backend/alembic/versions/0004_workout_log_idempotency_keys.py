@@ -0,0 +1,34 @@
+"""workout log idempotency keys
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable without default: a catalog-only change, existing logs keep NULL
+    op.add_column('workout_logs', sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index('uq_workout_logs_athlete_id_idempotency_key', 'workout_logs',
+                        ['athlete_id', 'idempotency_key'], unique=True,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_workout_logs_athlete_id_idempotency_key', table_name='workout_logs',
+                      postgresql_concurrently=True, if_exists=True)
+    op.drop_column('workout_logs', 'idempotency_key')
@@ -0,0 +1,62 @@
+"""workout log numeric weights
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 15:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL_BATCH_SIZE = 10000
+
+# Same rules as app.core.units.parse_weight_kg: a number (dot or comma
+# decimal), optionally followed by kg or lb, below 100000 kg; anything else
+# becomes NULL.
+WEIGHT_KG_PER_SET = r"""
+    ARRAY(
+        SELECT CASE WHEN k.kg < 100000 THEN k.kg END
+        FROM unnest(weight_used_per_set) WITH ORDINALITY AS w(value, n)
+        CROSS JOIN LATERAL regexp_match(
+            w.value, '^\s*(\d+(?:[.,]\d+)?)\s*(kg|kgs|lb|lbs)?\s*$', 'i') AS m
+        CROSS JOIN LATERAL (SELECT round(
+            replace(m[1], ',', '.')::numeric
+            * CASE WHEN lower(m[2]) LIKE 'lb%%' THEN 0.45359237 ELSE 1 END, 2) AS kg) AS k
+        ORDER BY n
+    )
+"""
+
+
+def upgrade() -> None:
+    op.add_column('workout_logs', sa.Column(
+        'weight_kg_per_set', postgresql.ARRAY(sa.Numeric(precision=7, scale=2)), nullable=True))
+
+    if context.is_offline_mode():
+        op.execute(f'UPDATE workout_logs SET weight_kg_per_set = {WEIGHT_KG_PER_SET}')
+        return
+
+    # Backfill in id ranges, each committed on its own, so the table is never
+    # locked for the whole rewrite
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text('SELECT max(id) FROM workout_logs')).scalar() or 0
+    with op.get_context().autocommit_block():
+        for start in range(0, max_id + 1, BACKFILL_BATCH_SIZE):
+            bind.execute(sa.text(
+                f'UPDATE workout_logs SET weight_kg_per_set = {WEIGHT_KG_PER_SET} '
+                'WHERE id >= :start AND id < :end AND weight_kg_per_set IS NULL'
+            ), {'start': start, 'end': start + BACKFILL_BATCH_SIZE})
+
+
+def downgrade() -> None:
+    op.drop_column('workout_logs', 'weight_kg_per_set')
@@ -0,0 +1,51 @@
+"""workout sets
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by dual-write and scripts.backfill_workout_sets, not here
+    op.create_table('workout_sets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('workout_log_id', sa.Integer(), nullable=False),
+    sa.Column('athlete_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('performed_at', sa.DateTime(), nullable=True),
+    sa.Column('set_number', sa.Integer(), nullable=False),
+    sa.Column('reps', sa.Integer(), nullable=False),
+    sa.Column('weight_kg', sa.Numeric(precision=7, scale=2), nullable=True),
+    sa.Column('rest_seconds', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['athlete_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ),
+    sa.ForeignKeyConstraint(['workout_log_id'], ['workout_logs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_workout_sets_id'), 'workout_sets', ['id'], unique=False)
+    op.create_index(op.f('ix_workout_sets_workout_log_id'), 'workout_sets', ['workout_log_id'], unique=False)
+    op.create_index('ix_workout_sets_athlete_id_exercise_id_reps', 'workout_sets',
+                    ['athlete_id', 'exercise_id', 'reps', sa.text('weight_kg DESC')], unique=False)
+    op.create_index('ix_workout_sets_athlete_id_performed_at', 'workout_sets',
+                    ['athlete_id', 'performed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workout_sets_athlete_id_performed_at', table_name='workout_sets')
+    op.drop_index('ix_workout_sets_athlete_id_exercise_id_reps', table_name='workout_sets')
+    op.drop_index(op.f('ix_workout_sets_workout_log_id'), table_name='workout_sets')
+    op.drop_index(op.f('ix_workout_sets_id'), table_name='workout_sets')
+    op.drop_table('workout_sets')
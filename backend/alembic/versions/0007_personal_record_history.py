@@ -0,0 +1,50 @@
+"""personal record history
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('personal_record_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('athlete_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('reps', sa.Integer(), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=True),
+    sa.Column('date_achieved', sa.Date(), nullable=True),
+    sa.Column('workout_log_id', sa.Integer(), nullable=True),
+    sa.Column('recorded_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['athlete_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ),
+    sa.ForeignKeyConstraint(['workout_log_id'], ['workout_logs.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_personal_record_history_athlete_id_exercise_id_reps',
+                    'personal_record_history', ['athlete_id', 'exercise_id', 'reps', 'id'], unique=False)
+    # Earlier history was never kept: start each timeline at the current record
+    op.execute("""
+        INSERT INTO personal_record_history
+               (athlete_id, exercise_id, reps, weight, date_achieved, workout_log_id)
+        SELECT athlete_id, exercise_id, reps, weight, date_achieved, workout_log_id
+        FROM personal_records ORDER BY date_achieved, id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_personal_record_history_athlete_id_exercise_id_reps',
+                  table_name='personal_record_history')
+    op.drop_table('personal_record_history')
@@ -0,0 +1,39 @@
+"""exercise best e1rms
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 19:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by scripts.rebuild_prs (the formula is a setting), not here
+    op.create_table('exercise_best_e1rms',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('athlete_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('best_e1rm', sa.Float(), nullable=False),
+    sa.Column('date_achieved', sa.Date(), nullable=False),
+    sa.Column('workout_log_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['athlete_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ),
+    sa.ForeignKeyConstraint(['workout_log_id'], ['workout_logs.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('athlete_id', 'exercise_id', name='uq_exercise_best_e1rms_athlete_exercise')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('exercise_best_e1rms')
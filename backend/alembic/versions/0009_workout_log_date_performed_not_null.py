@@ -0,0 +1,38 @@
+"""workout log date_performed not null
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # date_performed is the keyset pagination key. NULLs sort first in the
+    # descending history, so stamping them now keeps their position.
+    op.execute("UPDATE workout_logs SET date_performed = now() AT TIME ZONE 'utc' "
+               "WHERE date_performed IS NULL")
+    op.alter_column('workout_logs', 'date_performed',
+                    server_default=sa.text("(now() AT TIME ZONE 'utc')"))
+    # A validated CHECK lets SET NOT NULL skip its full-table scan under the
+    # exclusive lock; the validation itself only takes a SHARE UPDATE EXCLUSIVE lock
+    op.execute("ALTER TABLE workout_logs ADD CONSTRAINT workout_logs_date_performed_not_null "
+               "CHECK (date_performed IS NOT NULL) NOT VALID")
+    op.execute("ALTER TABLE workout_logs VALIDATE CONSTRAINT workout_logs_date_performed_not_null")
+    op.alter_column('workout_logs', 'date_performed', nullable=False)
+    op.drop_constraint('workout_logs_date_performed_not_null', 'workout_logs', type_='check')
+
+
+def downgrade() -> None:
+    op.alter_column('workout_logs', 'date_performed', nullable=True, server_default=None)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -8,11 +8,56 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
 
     DATABASE_URL: str
+    # asyncpg URL for async handlers; derived from DATABASE_URL when unset.
+    ASYNC_DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Per-statement timeout applied to every connection (0 disables it).
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    # Comma-separated streaming replica URLs used by read-only endpoints.
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_HEALTH_CHECK_SECONDS: int = 5
+    # Fail (instead of only logging) requests that exceed their SQL query budget.
+    QUERY_BUDGET_STRICT: bool = False
+    # Who maintains meal/plan nutrition totals: "app" (incremental updates in
+    # the routers) or "database" (triggers on food_items/meals, also covering
+    # bulk SQL imports). Applied to the database by scripts.bootstrap.
+    NUTRITION_TOTALS_ENGINE: Literal["app", "database"] = "app"
+    # Also write one workout_sets row per logged set, and read volume and PR
+    # recomputes from it (backfill existing logs with
+    # scripts.backfill_workout_sets after enabling it).
+    WORKOUT_SETS_DUAL_WRITE: bool = False
+    # Formula of the stored best estimated 1RMs (rebuild them with
+    # scripts.rebuild_prs after changing it).
+    E1RM_FORMULA: Literal["epley", "brzycki", "lombardi"] = "epley"
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
 
+    # Resolve the current user from access token claims instead of the DB.
+    STATELESS_AUTH: bool = False
+    # Seconds between DB checks of a user's active/deleted status, role and
+    # coach in stateless mode (0 disables the check).
+    AUTH_REVOCATION_CHECK_SECONDS: int = 60
+    # In-process LRU cache of authenticated users keyed by token subject
+    # (TTL 0 disables it).
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # Dedicated pool for bcrypt hashing/verification; requests beyond
+    # workers + queue are rejected with 503 instead of piling up.
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    # bcrypt cost (log2 rounds). Hashes with a different cost are rehashed
+    # on the next successful login; see scripts/calibrate_bcrypt.py.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_REHASH_ON_LOGIN: bool = True
+
     SUPERUSER_EMAIL: str
     SUPERUSER_PASSWORD: str
 
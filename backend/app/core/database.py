@@ -1,18 +1,182 @@
-from sqlalchemy import create_engine
+import itertools
+import logging
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.query_budget import uncounted
+
+logger = logging.getLogger(__name__)
+
+
+def _engine_kwargs(url: str) -> dict:
+    kwargs = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0 and url.startswith("postgresql"):
+        kwargs["connect_args"] = {
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    return kwargs
+
+
+def _to_async_url(url: str) -> str:
+    return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
+def _async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return _to_async_url(settings.DATABASE_URL)
+
+
+def _async_engine_kwargs(url: str) -> dict:
+    kwargs = _engine_kwargs(url)
+    # asyncpg takes server settings instead of libpq options
+    if "connect_args" in kwargs:
+        kwargs["connect_args"] = {
+            "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        }
+    return kwargs
 
-engine = create_engine(settings.DATABASE_URL)
+
+engine = create_engine(settings.DATABASE_URL, **_engine_kwargs(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    _async_database_url(), **_async_engine_kwargs(_async_database_url()))
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False)
+
+# Streaming replicas for read-only endpoints, see get_read_db
+_replica_urls = [
+    url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+replica_engines = [
+    create_engine(url, **_engine_kwargs(url)) for url in _replica_urls]
+ReplicaSessionLocals = [
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    for replica_engine in replica_engines]
+async_replica_engines = [
+    create_async_engine(_to_async_url(url), **_async_engine_kwargs(url)) for url in _replica_urls]
+AsyncReplicaSessionLocals = [
+    async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False)
+    for replica_engine in async_replica_engines]
+
+_replica_cursor = itertools.count()
+# replica index -> True if reachable and within DB_REPLICA_MAX_LAG_SECONDS
+_replica_health = TTLCache(
+    max(len(_replica_urls), 1), settings.DB_REPLICA_HEALTH_CHECK_SECONDS)
+_REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
 Base = declarative_base()
 
 
+def pool_status(bind=engine) -> dict:
+    """Live checkout statistics of an engine's connection pool."""
+    pool = bind.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout_seconds": settings.DB_POOL_TIMEOUT,
+    }
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _replica_order() -> list:
+    """Replica indexes in round-robin order, starting with the next one up."""
+    start = next(_replica_cursor)
+    count = len(replica_engines)
+    return [(start + offset) % count for offset in range(count)]
+
+
+def _lag_within_limit(lag_seconds, index: int) -> bool:
+    healthy = float(lag_seconds or 0) <= settings.DB_REPLICA_MAX_LAG_SECONDS
+    if not healthy:
+        logger.warning("Replica %d is lagging %.1fs behind, skipping it", index, lag_seconds)
+    return healthy
+
+
+def _check_replica(index: int) -> bool:
+    try:
+        with uncounted(), replica_engines[index].connect() as connection:
+            healthy = _lag_within_limit(connection.execute(_REPLICA_LAG_QUERY).scalar(), index)
+    except Exception:
+        logger.warning("Replica %d is unreachable, skipping it", index, exc_info=True)
+        healthy = False
+    _replica_health.set(index, healthy)
+    return healthy
+
+
+async def _check_replica_async(index: int) -> bool:
+    try:
+        with uncounted():
+            async with async_replica_engines[index].connect() as connection:
+                lag_seconds = (await connection.execute(_REPLICA_LAG_QUERY)).scalar()
+        healthy = _lag_within_limit(lag_seconds, index)
+    except Exception:
+        logger.warning("Replica %d is unreachable, skipping it", index, exc_info=True)
+        healthy = False
+    _replica_health.set(index, healthy)
+    return healthy
+
+
+def get_read_db():
+    """
+    Session for read-only endpoints: round-robins over the configured replicas,
+    skipping unreachable or lagging ones, and falls back to the primary.
+    """
+    session_factory = SessionLocal
+    for index in _replica_order():
+        healthy = _replica_health.get(index)
+        if healthy is None:
+            healthy = _check_replica(index)
+        if healthy:
+            session_factory = ReplicaSessionLocals[index]
+            break
+
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """Async counterpart of get_read_db."""
+    session_factory = AsyncSessionLocal
+    for index in _replica_order():
+        healthy = _replica_health.get(index)
+        if healthy is None:
+            healthy = await _check_replica_async(index)
+        if healthy:
+            session_factory = AsyncReplicaSessionLocals[index]
+            break
+
+    async with session_factory() as db:
+        yield db
@@ -1,13 +1,12 @@
 from sqlalchemy.orm import Session
-from app.core.database import Base, engine
 from app.models.user import User, UserRole
 from app.core.security import get_password_hash
 from app.core.config import settings
 
 
 def init_db(db: Session) -> None:
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # Tables are created by the Alembic migrations (alembic upgrade head);
+    # this only seeds data and is run once per deploy, not per worker.
 
     # Create superuser if it doesn't exist
     superuser = db.query(User).filter(
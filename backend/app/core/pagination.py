@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _cursor_value(value: Any, column: Any) -> Any:
+    """Checks a decoded cursor value against its column type; raises ValueError."""
+    python_type = column.type.python_type
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise ValueError
+        return datetime.fromisoformat(value)
+    if python_type is float and isinstance(value, int):
+        value = float(value)
+    # bool is an int, but never a valid key value
+    if not isinstance(value, python_type) or isinstance(value, bool):
+        raise ValueError
+    return value
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Decodes a cursor made by encode_cursor for the given key columns. Tampered
+    or malformed cursors (including values of the wrong type, which would
+    otherwise reach the database) are a 400.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [_cursor_value(value, column) for value, column in zip(values, columns)]
+    except (ValueError, TypeError, UnicodeDecodeError, NotImplementedError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def keyset(query, cursor: Optional[str], *columns, descending: bool = False):
+    """
+    Orders a Query/Select by the given unique, NOT NULL key columns and, when a
+    cursor is given, starts right after it. Unlike offset(), deep pages cost the same as
+    the first one as long as an index covers the key.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        key = tuple_(*columns) if len(columns) > 1 else columns[0]
+        after = tuple_(*values) if len(columns) > 1 else values[0]
+        query = query.where(key < after if descending else key > after)
+    return query.order_by(*[column.desc() if descending else column for column in columns])
+
+
+def set_next_cursor(response: Response, rows: Sequence[Any], limit: int, *columns) -> None:
+    """Exposes the cursor of the next page in the X-Next-Cursor header, if there may be one."""
+    if rows and len(rows) >= limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last, column.key) for column in columns])
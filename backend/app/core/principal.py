@@ -0,0 +1,146 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User, UserRole
+
+_MISSING = object()
+
+
+@dataclass
+class UserPrincipal:
+    """
+    Lightweight stand-in for a User row, built from access token claims.
+    Exposes the attributes the routers rely on (id, email, role, is_active, coach_id).
+    """
+    id: int
+    email: str
+    role: UserRole
+    is_active: bool
+    coach_id: Optional[int] = None
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> Optional["UserPrincipal"]:
+        try:
+            return cls(
+                id=int(payload["uid"]),
+                email=payload["sub"],
+                role=UserRole(payload["role"]),
+                is_active=bool(payload.get("is_active", True)),
+                coach_id=payload.get("coach_id"),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            is_active=bool(user.is_active),
+            coach_id=user.coach_id,
+        )
+
+
+# token subject (email) -> UserPrincipal
+principal_cache = TTLCache(
+    settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+# user_id -> UserStatus, or None if the user no longer exists
+status_cache = TTLCache(
+    settings.USER_CACHE_MAX_SIZE, settings.AUTH_REVOCATION_CHECK_SECONDS)
+
+
+def get_principal_by_email(db: Session, email: str) -> Optional[UserPrincipal]:
+    """Returns the principal for a token subject, loading the User row on a cache miss."""
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    user = db.query(User).filter(User.email == email).first()
+    if not user:
+        return None
+    principal = UserPrincipal.from_user(user)
+    principal_cache.set(email, principal)
+    return principal
+
+
+async def get_principal_by_email_async(db: AsyncSession, email: str) -> Optional[UserPrincipal]:
+    """Async counterpart of get_principal_by_email, sharing its cache."""
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
+    if not user:
+        return None
+    principal = UserPrincipal.from_user(user)
+    principal_cache.set(email, principal)
+    return principal
+
+
+@dataclass(frozen=True)
+class UserStatus:
+    """The authorization-relevant columns of a user, re-checked in stateless mode."""
+    is_active: bool
+    role: UserRole
+    coach_id: Optional[int] = None
+
+    def apply_to(self, principal: UserPrincipal) -> UserPrincipal:
+        """Overrides the token claims with the current values."""
+        principal.is_active = principal.is_active and self.is_active
+        principal.role = self.role
+        principal.coach_id = self.coach_id
+        return principal
+
+
+def check_user_status(db: Session, user_id: int) -> Optional[UserStatus]:
+    """
+    Returns the user's current status (None if the user was deleted), hitting
+    the DB at most once per AUTH_REVOCATION_CHECK_SECONDS per user.
+    """
+    cached = status_cache.get(user_id, _MISSING)
+    if cached is not _MISSING:
+        return cached
+
+    row = db.query(User.is_active, User.role, User.coach_id).filter(User.id == user_id).first()
+    return _cache_status(user_id, row)
+
+
+async def check_user_status_async(db: AsyncSession, user_id: int) -> Optional[UserStatus]:
+    """Async counterpart of check_user_status, sharing its cache."""
+    cached = status_cache.get(user_id, _MISSING)
+    if cached is not _MISSING:
+        return cached
+
+    row = (await db.execute(
+        select(User.is_active, User.role, User.coach_id).where(User.id == user_id))).first()
+    return _cache_status(user_id, row)
+
+
+def _cache_status(user_id: int, row) -> Optional[UserStatus]:
+    user_status = None if row is None else UserStatus(
+        is_active=bool(row.is_active), role=row.role, coach_id=row.coach_id)
+    status_cache.set(user_id, user_status)
+    return user_status
+
+
+def invalidate_user(user_id: Optional[int] = None, email: Optional[str] = None) -> None:
+    """
+    Drops any cached principal/status so the next request re-reads the DB.
+
+    Only this process's caches are dropped. Other workers pick up a
+    deactivation, role change or coach reassignment once their entry expires:
+    within USER_CACHE_TTL_SECONDS, or AUTH_REVOCATION_CHECK_SECONDS in
+    stateless mode. With AUTH_REVOCATION_CHECK_SECONDS=0, stateless mode
+    trusts the token claims until the access token expires.
+    """
+    if user_id is not None:
+        status_cache.pop(user_id)
+    if email is not None:
+        principal_cache.pop(email)
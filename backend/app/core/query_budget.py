@@ -0,0 +1,66 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator, List, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Mutable [count] shared with the threadpool copies of the request context
+_query_counter: ContextVar[Optional[List[int]]] = ContextVar("query_counter", default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+@contextmanager
+def count_queries() -> Iterator[List[int]]:
+    """Counts SQL statements executed in this context: `with count_queries() as n: ...; n[0]`."""
+    counter = [0]
+    token = _query_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_counter.reset(token)
+
+
+@contextmanager
+def uncounted() -> Iterator[None]:
+    """Excludes infrastructure queries (e.g. replica health checks) from the budget."""
+    token = _query_counter.set(None)
+    try:
+        yield
+    finally:
+        _query_counter.reset(token)
+
+
+def query_budget(max_queries: int):
+    """
+    Route dependency that counts the SQL statements a request issues, including
+    lazy loads during response serialization, and reports requests above
+    max_queries. With QUERY_BUDGET_STRICT (tests/CI) the request fails instead.
+    """
+    async def check_query_budget(request: Request) -> AsyncIterator[None]:
+        with count_queries() as counter:
+            yield
+        if counter[0] > max_queries:
+            message = (f"{request.method} {request.url.path} issued {counter[0]} SQL queries, "
+                       f"budget is {max_queries}")
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+    return check_query_budget
@@ -1,20 +1,72 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
+class PasswordHashingBusy(Exception):
+    """Raised when the password hashing pool and its queue are full."""
+
+
+# bcrypt releases the GIL, so a small thread pool gives real parallelism while
+# capping how many CPU-heavy hashes run at once.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE)
+
+
+def _submit_hash_job(fn: Callable[..., Any], *args: Any) -> Future:
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHashingBusy()
+    try:
+        future = _hash_executor.submit(fn, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _submit_hash_job(pwd_context.verify, plain_password, hashed_password).result()
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _submit_hash_job(pwd_context.hash, password).result()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash for async endpoints: awaits the pool instead of blocking the loop."""
+    return await asyncio.wrap_future(_submit_hash_job(pwd_context.hash, password))
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different scheme or cost than configured."""
+    return pwd_context.needs_update(hashed_password)
+
+
+def access_token_claims(user) -> dict:
+    """
+    Claims embedded in access tokens so the current user can be resolved
+    without a DB round-trip (see settings.STATELESS_AUTH).
+    """
+    return {
+        "sub": user.email,
+        "uid": user.id,
+        "role": user.role,
+        "is_active": user.is_active,
+        "coach_id": user.coach_id,
+    }
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
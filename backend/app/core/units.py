@@ -0,0 +1,36 @@
+import re
+from typing import Iterable, List, Optional
+
+KG_PER_LB = 0.45359237
+# Exclusive upper bound of workout_logs.weight_kg_per_set (NUMERIC(7, 2))
+MAX_WEIGHT_KG = 100000
+
+# "50", "52.5", "52,5", "50kg", "110 lbs"; without a unit the weight is in kg
+_WEIGHT_PATTERN = re.compile(r"^\s*(\d+(?:[.,]\d+)?)\s*(kg|kgs|lb|lbs)?\s*$", re.IGNORECASE)
+
+
+def parse_weight_kg(value: str) -> float:
+    """Parses a logged weight into kilograms, rounded to 2 decimals; raises ValueError."""
+    match = _WEIGHT_PATTERN.match(value or "")
+    if not match:
+        raise ValueError(f"Invalid weight {value!r}: expected a number, optionally followed by kg or lb")
+    weight = float(match.group(1).replace(",", "."))
+    if match.group(2) and match.group(2).lower().startswith("lb"):
+        weight *= KG_PER_LB
+    weight = round(weight, 2)
+    if weight >= MAX_WEIGHT_KG:
+        raise ValueError(f"Invalid weight {value!r}: must be below {MAX_WEIGHT_KG} kg")
+    return weight
+
+
+def weights_to_kg(values: Optional[Iterable[str]]) -> Optional[List[Optional[float]]]:
+    """parse_weight_kg for a whole log; entries that do not parse become None."""
+    if values is None:
+        return None
+    weights: List[Optional[float]] = []
+    for value in values:
+        try:
+            weights.append(parse_weight_kg(value))
+        except ValueError:
+            weights.append(None)
+    return weights
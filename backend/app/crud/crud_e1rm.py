@@ -0,0 +1,197 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import datetime
+import math
+
+import numpy as np
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.plan import PlanExerciseDetails
+from app.models.pr import ExerciseBestE1RM
+from app.models.workout_log import WorkoutLog
+
+FORMULAS = ("epley", "brzycki", "lombardi")
+# Sets with more reps do not give a meaningful estimate (Brzycki diverges at 37)
+E1RM_MAX_REPS = 20
+REBUILD_BATCH_SIZE = 200
+
+
+def estimate_1rm(weights, reps, formula: Optional[str] = None) -> np.ndarray:
+    """
+    Estimated one-rep max of each set, over arrays of weights (kg, None for
+    non-numeric) and reps. A single rep is its own 1RM; sets without a positive
+    weight or with 0 or more than E1RM_MAX_REPS reps give NaN.
+    """
+    formula = formula or settings.E1RM_FORMULA
+    weights = np.asarray(weights, dtype=float)
+    reps = np.asarray(reps, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if formula == "epley":
+            estimates = weights * (1 + reps / 30)
+        elif formula == "brzycki":
+            estimates = weights * 36 / (37 - reps)
+        elif formula == "lombardi":
+            estimates = weights * reps ** 0.1
+        else:
+            raise ValueError(f"Unknown e1RM formula {formula!r}: expected one of {FORMULAS}")
+        estimates = np.where(reps == 1, weights, estimates)
+        valid = (weights > 0) & (reps > 0) & (reps <= E1RM_MAX_REPS)
+    return np.where(valid, np.round(estimates, 2), np.nan)
+
+
+def best_e1rm_per_log(
+    reps_per_log: Sequence[Sequence[int]],
+    weights_per_log: Sequence[Sequence[Optional[float]]],
+    formula: Optional[str] = None
+) -> np.ndarray:
+    """
+    Best e1RM of each log in one vectorized pass over all their sets; NaN for
+    logs without a valid set or whose reps and weights do not line up.
+    """
+    lengths = np.array([len(reps) if len(reps) == len(weights) else 0
+                        for reps, weights in zip(reps_per_log, weights_per_log)], dtype=int)
+    best = np.full(len(lengths), -np.inf)
+    if lengths.sum():
+        reps = [r for reps, n in zip(reps_per_log, lengths) if n for r in reps]
+        weights = [w for weights, n in zip(weights_per_log, lengths) if n for w in weights]
+        # fmax ignores the NaN of invalid sets
+        np.fmax.at(best, np.repeat(np.arange(len(lengths)), lengths),
+                   estimate_1rm(weights, reps, formula))
+    return np.where(np.isfinite(best), best, np.nan)
+
+
+# exercise_id -> (best_e1rm, date_achieved, workout_log_id)
+BestE1RMs = Dict[int, Tuple[float, datetime.date, Optional[int]]]
+
+
+def best_e1rms_for_logs(logs: Iterable[Tuple[WorkoutLog, int]]) -> BestE1RMs:
+    """
+    Reduces (workout log, exercise_id) pairs to the best e1RM per exercise,
+    keeping the first log on ties. Like PR detection, logs whose reps/weights
+    do not line up with sets_performed are not considered.
+    """
+    logs = [(workout_log, exercise_id) for workout_log, exercise_id in logs
+            if len(workout_log.reps_performed_per_set) == workout_log.sets_performed
+            and len(workout_log.weight_kg_per_set or []) == workout_log.sets_performed]
+    estimates = best_e1rm_per_log([log.reps_performed_per_set for log, _ in logs],
+                                  [log.weight_kg_per_set for log, _ in logs])
+    bests: BestE1RMs = {}
+    for (workout_log, exercise_id), e1rm in zip(logs, estimates.tolist()):
+        if not math.isnan(e1rm) and (exercise_id not in bests or e1rm > bests[exercise_id][0]):
+            bests[exercise_id] = (e1rm, workout_log.date_performed.date(), workout_log.id)
+    return bests
+
+
+def upsert_best_e1rms(db: Session, *, athlete_id: int, bests: BestE1RMs, replace: bool = False) -> None:
+    """
+    Stores an athlete's best e1RMs with one INSERT ... ON CONFLICT that only
+    raises lower values (or, with `replace`, overwrites them). Rows are written
+    in exercise order so concurrent logs lock them in the same order.
+    The caller commits.
+    """
+    if not bests:
+        return
+    stmt = insert(ExerciseBestE1RM).values([
+        dict(athlete_id=athlete_id, exercise_id=exercise_id, best_e1rm=e1rm,
+             date_achieved=date_achieved, workout_log_id=workout_log_id)
+        for exercise_id, (e1rm, date_achieved, workout_log_id) in sorted(bests.items())
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        constraint="uq_exercise_best_e1rms_athlete_exercise",
+        set_=dict(best_e1rm=stmt.excluded.best_e1rm, date_achieved=stmt.excluded.date_achieved,
+                  workout_log_id=stmt.excluded.workout_log_id),
+        where=None if replace else stmt.excluded.best_e1rm > ExerciseBestE1RM.best_e1rm
+    ))
+
+
+def _logged_sets(athlete_ids: Sequence[int], exercise_id: Optional[int] = None):
+    query = select(
+        WorkoutLog.athlete_id, PlanExerciseDetails.exercise_id, WorkoutLog.id,
+        WorkoutLog.date_performed, WorkoutLog.reps_performed_per_set, WorkoutLog.weight_kg_per_set
+    ).join(
+        PlanExerciseDetails, PlanExerciseDetails.id == WorkoutLog.plan_exercise_details_id
+    ).where(
+        WorkoutLog.athlete_id.in_(athlete_ids),
+        WorkoutLog.sets_performed == func.cardinality(WorkoutLog.reps_performed_per_set),
+        WorkoutLog.sets_performed == func.cardinality(WorkoutLog.weight_kg_per_set)
+    )
+    if exercise_id is not None:
+        query = query.where(PlanExerciseDetails.exercise_id == exercise_id)
+    return query.order_by(WorkoutLog.date_performed, WorkoutLog.id)
+
+
+def _best_per_exercise(rows) -> Dict[Tuple[int, int], Tuple[float, datetime.date, int]]:
+    """(athlete_id, exercise_id) -> best e1RM of the _logged_sets rows, earliest log on ties."""
+    estimates = best_e1rm_per_log([row.reps_performed_per_set for row in rows],
+                                  [row.weight_kg_per_set for row in rows])
+    bests: Dict[Tuple[int, int], Tuple[float, datetime.date, int]] = {}
+    for row, e1rm in zip(rows, estimates.tolist()):
+        key = (row.athlete_id, row.exercise_id)
+        if not math.isnan(e1rm) and (key not in bests or e1rm > bests[key][0]):
+            bests[key] = (e1rm, row.date_performed.date(), row.id)
+    return bests
+
+
+def recompute_best_e1rm(
+    db: Session, *, athlete_id: int, exercise_id: int, exclude_log_id: Optional[int] = None
+) -> None:
+    """
+    Recomputes an athlete's best e1RM for one exercise from their (flushed)
+    logs, e.g. after a log was corrected or before it is deleted
+    (exclude_log_id). The caller commits.
+    """
+    rows = [row for row in db.execute(_logged_sets([athlete_id], exercise_id))
+            if row.id != exclude_log_id]
+    best = _best_per_exercise(rows).get((athlete_id, exercise_id))
+    if best is None:
+        db.execute(delete(ExerciseBestE1RM).where(
+            ExerciseBestE1RM.athlete_id == athlete_id, ExerciseBestE1RM.exercise_id == exercise_id))
+    else:
+        upsert_best_e1rms(db, athlete_id=athlete_id, bests={exercise_id: best}, replace=True)
+
+
+def rebuild_best_e1rms(db: Session, *, batch_size: int = REBUILD_BATCH_SIZE) -> Iterator[Dict[str, int]]:
+    """
+    Recomputes every athlete's best e1RMs with the current formula, replacing
+    the stored rows one committed batch of athletes at a time. Yields progress
+    after each batch: athletes done/total and best e1RMs stored so far.
+    """
+    athlete_ids = list(db.scalars(
+        select(WorkoutLog.athlete_id).union(select(ExerciseBestE1RM.athlete_id)).order_by(text("1"))))
+    progress = {"athletes_done": 0, "athletes_total": len(athlete_ids), "stored": 0}
+    for start in range(0, len(athlete_ids), batch_size):
+        batch = athlete_ids[start:start + batch_size]
+        bests = _best_per_exercise(db.execute(_logged_sets(batch)).all())
+        db.execute(delete(ExerciseBestE1RM).where(ExerciseBestE1RM.athlete_id.in_(batch)))
+        if bests:
+            db.execute(insert(ExerciseBestE1RM).values([
+                dict(athlete_id=athlete_id, exercise_id=exercise_id, best_e1rm=e1rm,
+                     date_achieved=date_achieved, workout_log_id=workout_log_id)
+                for (athlete_id, exercise_id), (e1rm, date_achieved, workout_log_id) in sorted(bests.items())
+            ]))
+        db.commit()
+        progress.update(athletes_done=start + len(batch), stored=progress["stored"] + len(bests))
+        yield dict(progress)
+
+
+async def get_e1rm_history_async(
+    db: AsyncSession, athlete_id: int, exercise_id: int, *,
+    formula: Optional[str] = None, since: Optional[datetime.datetime] = None
+) -> List[Dict]:
+    """
+    The best e1RM of each of an athlete's logs of an exercise, oldest first,
+    evaluated for all logs at once. Logs without a valid set are left out.
+    """
+    query = _logged_sets([athlete_id], exercise_id)
+    if since is not None:
+        query = query.where(WorkoutLog.date_performed >= since)
+    rows = (await db.execute(query)).all()
+    estimates = best_e1rm_per_log([row.reps_performed_per_set for row in rows],
+                                  [row.weight_kg_per_set for row in rows], formula)
+    return [
+        {"workout_log_id": row.id, "date_performed": row.date_performed, "e1rm": e1rm}
+        for row, e1rm in zip(rows, estimates.tolist()) if not math.isnan(e1rm)
+    ]
@@ -0,0 +1,117 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, or_, select, text, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.nutrition_plan import FoodItem, Meal, NutritionPlan
+
+MACROS = ("calories", "protein", "carbs", "fats")
+# Drift below this is float rounding, not an inconsistency
+TOTALS_TOLERANCE = 1e-6
+
+
+def macro_totals(items) -> Dict[str, float]:
+    """Sum the macros of food items (or any objects with calories/protein/carbs/fats)."""
+    return {f"total_{macro}": sum(getattr(item, macro) for item in items) for macro in MACROS}
+
+
+def macro_delta(new: Optional[Any] = None, old: Optional[Any] = None) -> Dict[str, float]:
+    """
+    Change in macros when `old` becomes `new`; pass only `new` for an insert
+    and only `old` for a delete. Works for food items and, via the total_*
+    attributes, for meals.
+    """
+    def macros(obj: Optional[Any], macro: str) -> float:
+        if obj is None:
+            return 0
+        value = getattr(obj, macro, None)
+        if value is None:
+            value = getattr(obj, f"total_{macro}", None)
+        return value or 0
+
+    return {macro: macros(new, macro) - macros(old, macro) for macro in MACROS}
+
+
+def apply_macro_delta(
+    db: Session, delta: Dict[str, float], *, plan_id: int, meal_id: Optional[int] = None
+) -> None:
+    """
+    Shifts the stored totals of a meal (optional) and its plan by `delta` with
+    in-place UPDATEs, instead of re-summing the plan's whole meal/food tree.
+    No-op when the database triggers maintain the totals.
+    """
+    if settings.NUTRITION_TOTALS_ENGINE == "database" or not any(delta.values()):
+        return
+    def shifted(model):
+        # NULL totals count as 0, as in the 0003 triggers
+        return {getattr(model, f"total_{macro}"):
+                func.coalesce(getattr(model, f"total_{macro}"), 0) + delta[macro]
+                for macro in MACROS}
+
+    if meal_id is not None:
+        db.execute(update(Meal).where(Meal.id == meal_id).values(shifted(Meal)))
+    db.execute(update(NutritionPlan).where(NutritionPlan.id == plan_id).values(shifted(NutritionPlan)))
+
+
+def _summed(column, parent_key, parent_id):
+    return select(func.coalesce(func.sum(column), 0)).where(
+        parent_key == parent_id).scalar_subquery()
+
+
+def _drifted(model, sums: Dict[str, Any]):
+    return or_(*[
+        func.abs(func.coalesce(getattr(model, f"total_{macro}"), 0) - sums[macro]) > TOTALS_TOLERANCE
+        for macro in MACROS
+    ])
+
+
+def reconcile_nutrition_totals(db: Session, *, repair: bool = True) -> Dict[str, List[int]]:
+    """
+    Verifies the stored meal and plan totals against their food items with
+    set-based SQL and, if `repair`, rewrites the ones that drifted.
+    Returns the ids of the drifted meals and plans.
+    """
+    meal_sums = {macro: _summed(getattr(FoodItem, macro), FoodItem.meal_id, Meal.id)
+                 for macro in MACROS}
+    drifted_meal_ids = list(db.scalars(select(Meal.id).where(_drifted(Meal, meal_sums))))
+    if repair and drifted_meal_ids:
+        db.execute(
+            update(Meal).where(Meal.id.in_(drifted_meal_ids))
+            .values({getattr(Meal, f"total_{macro}"): meal_sums[macro] for macro in MACROS})
+            .execution_options(synchronize_session=False))
+
+    # Checked after the meal repair, so plans are compared with correct meals
+    plan_sums = {macro: _summed(getattr(Meal, f"total_{macro}"), Meal.nutrition_plan_id, NutritionPlan.id)
+                 for macro in MACROS}
+    drifted_plan_ids = list(db.scalars(
+        select(NutritionPlan.id).where(_drifted(NutritionPlan, plan_sums))))
+    if repair and drifted_plan_ids:
+        db.execute(
+            update(NutritionPlan).where(NutritionPlan.id.in_(drifted_plan_ids))
+            .values({getattr(NutritionPlan, f"total_{macro}"): plan_sums[macro] for macro in MACROS})
+            .execution_options(synchronize_session=False))
+
+    if repair:
+        db.commit()
+    return {"meals": drifted_meal_ids, "plans": drifted_plan_ids}
+
+
+def sync_totals_engine(db: Session) -> bool:
+    """
+    Enables the nutrition totals triggers (migration 0003) when
+    NUTRITION_TOTALS_ENGINE is "database" and disables them otherwise. On a
+    switch the totals are reconciled in the same transaction, which holds the
+    table locks taken by ALTER TABLE. Returns whether anything changed.
+    """
+    enable = settings.NUTRITION_TOTALS_ENGINE == "database"
+    triggers = db.execute(text(
+        "SELECT c.relname, t.tgname FROM pg_trigger t JOIN pg_class c ON c.oid = t.tgrelid "
+        "WHERE t.tgname LIKE 'nutrition_totals_%' AND (t.tgenabled <> 'D') <> :enable"
+    ), {"enable": enable}).all()
+    if not triggers:
+        return False
+    for table, trigger in triggers:
+        db.execute(text(f"ALTER TABLE {table} {'ENABLE' if enable else 'DISABLE'} TRIGGER {trigger}"))
+    reconcile_nutrition_totals(db)
+    return True
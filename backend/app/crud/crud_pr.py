@@ -1,9 +1,12 @@
-from typing import Any, Dict, List, Optional, Tuple, Union
-from sqlalchemy.orm import Session
-from sqlalchemy import desc # Required for ordering in get_prs_by_athlete if not done at model level
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload, undefer
+from sqlalchemy import and_, desc, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
 
-from app.models.pr import PersonalRecord
-from app.models.workout_log import WorkoutLog # Needed for find_or_create_pr_for_log type hint
+from app.core.config import settings
+from app.models.pr import ExerciseBestE1RM, PersonalRecord, PersonalRecordHistory
+from app.models.workout_log import WorkoutLog
 from app.schemas.pr import PersonalRecordCreate, PersonalRecordUpdate
 import datetime
 
@@ -22,12 +25,25 @@ def get_prs_by_athlete(db: Session, athlete_id: int, skip: int = 0, limit: int =
         desc(PersonalRecord.date_achieved), PersonalRecord.id # Added secondary sort for consistency
     ).offset(skip).limit(limit).all()
 
+async def get_prs_by_athlete_async(db: AsyncSession, athlete_id: int, skip: int = 0, limit: int = 100) -> List[PersonalRecord]:
+    result = await db.execute(
+        select(PersonalRecord)
+        .options(selectinload(PersonalRecord.exercise), # Nested in PersonalRecordRead
+                 undefer(PersonalRecord.best_e1rm))
+        .where(PersonalRecord.athlete_id == athlete_id)
+        .order_by(desc(PersonalRecord.date_achieved), PersonalRecord.id)
+        .offset(skip).limit(limit)
+    )
+    return result.scalars().all()
+
 def create_pr(db: Session, *, obj_in: PersonalRecordCreate, athlete_id: int) -> PersonalRecord:
     db_obj = PersonalRecord(
         **obj_in.dict(),
         athlete_id=athlete_id
     )
     db.add(db_obj)
+    db.flush()
+    record_history(db, [db_obj])
     db.commit()
     db.refresh(db_obj)
     return db_obj
@@ -44,6 +60,8 @@ def update_pr(
         setattr(db_obj, field, value)
 
     db.add(db_obj)
+    db.flush()
+    record_history(db, [db_obj])
     db.commit()
     db.refresh(db_obj)
     return db_obj
@@ -59,45 +77,297 @@ def find_or_create_pr_for_log(
     workout_log_id: Optional[int] = None # Added
 ) -> Tuple[Optional[PersonalRecord], bool]:
     """
-    Finds an existing PR for the given athlete, exercise, and reps.
-    If it exists and the new weight is higher, updates it.
-    If it doesn't exist and the weight is positive, creates a new PR.
+    Creates the PR for the given athlete, exercise, and reps, or raises it if
+    the new weight is higher, as one conditional upsert (see upsert_prs_batch), so
+    concurrent submissions can neither collide on uq_athlete_exercise_reps nor
+    overwrite a heavier record.
     Returns the PR object (or None if no PR is relevant) and a boolean indicating if a new PR was made or an existing one was improved.
     """
+    best_weights = {reps_achieved: weight_lifted} if reps_achieved > 0 and weight_lifted > 0 else {}
+    improved = upsert_prs(
+        db,
+        athlete_id=athlete_id,
+        exercise_id=exercise_id,
+        best_weights=best_weights,
+        date_achieved=date_achieved,
+        workout_log_id=workout_log_id
+    )
+    if improved:
+        db.commit()
+        return improved[0], True
 
+    # Existing PR is not beaten (or the set is not a valid lift)
     existing_pr = get_pr_by_details(
         db,
         athlete_id=athlete_id,
         exercise_id=exercise_id,
         reps=reps_achieved
     )
+    return existing_pr, False
 
-    new_or_updated_pr_achieved = False
-    pr_to_return = None
+def best_weight_per_reps(reps_per_set: List[int], weight_kg_per_set: List[Optional[float]]) -> Dict[int, float]:
+    """
+    Reduces a log's sets to the heaviest weight per rep count, the only sets
+    that can be PRs. Sets with non-positive reps/weight or without a numeric
+    weight (legacy entries) are ignored.
+    """
+    best: Dict[int, float] = {}
+    for reps, weight in zip(reps_per_set, weight_kg_per_set):
+        if weight is not None and reps > 0 and weight > best.get(reps, 0):
+            best[reps] = weight
+    return best
 
-    if existing_pr:
-        if weight_lifted > existing_pr.weight:
-            pr_data_update = PersonalRecordUpdate(
-                weight=weight_lifted,
-                date_achieved=date_achieved,
-                workout_log_id=workout_log_id
-            )
-            pr_to_return = update_pr(db, db_obj=existing_pr, obj_in=pr_data_update)
-            new_or_updated_pr_achieved = True
-        else:
-            # Existing PR is not beaten
-            pr_to_return = existing_pr
-    else:
-        # No existing PR for these reps, create a new one if weight is positive
-        if weight_lifted > 0: # Only create PRs for actual lifts
-            pr_data_create = PersonalRecordCreate(
-                exercise_id=exercise_id,
-                reps=reps_achieved,
-                weight=weight_lifted,
-                date_achieved=date_achieved,
-                workout_log_id=workout_log_id
+# (exercise_id, reps) -> (weight, date_achieved, workout_log_id)
+Lifts = Dict[Tuple[int, int], Tuple[float, datetime.date, Optional[int]]]
+
+def best_lifts_for_logs(logs: Iterable[Tuple[WorkoutLog, int]]) -> Lifts:
+    """
+    Reduces (workout log, exercise_id) pairs to the heaviest lift per exercise
+    and rep count, keeping the first log on ties. Logs whose reps/weights do
+    not line up with sets_performed are not considered for PRs.
+    """
+    lifts: Lifts = {}
+    for workout_log, exercise_id in logs:
+        num_sets = workout_log.sets_performed
+        weights = workout_log.weight_kg_per_set or []
+        if len(workout_log.reps_performed_per_set) != num_sets or len(weights) != num_sets:
+            continue
+        best_weights = best_weight_per_reps(workout_log.reps_performed_per_set, weights)
+        for reps, weight in best_weights.items():
+            key = (exercise_id, reps)
+            if key not in lifts or weight > lifts[key][0]:
+                lifts[key] = (weight, workout_log.date_performed.date(), workout_log.id)
+    return lifts
+
+def upsert_prs_batch(db: Session, *, athlete_id: int, lifts: Lifts) -> List[PersonalRecord]:
+    """
+    PR detection for any number of lifts of one athlete: one SELECT for the
+    current PRs and, only if some are beaten, one INSERT ... ON CONFLICT DO
+    UPDATE that only overwrites lighter records.
+    Returns the PRs that were created or improved. The caller commits.
+
+    Safe under concurrent submissions: the conflict clause re-checks the weight
+    against the committed row, and rows are written in (exercise, reps) order
+    so parallel upserts lock them in the same order.
+    """
+    if not lifts:
+        return []
+
+    current = {
+        (exercise_id, reps): weight
+        for exercise_id, reps, weight in db.execute(
+            select(PersonalRecord.exercise_id, PersonalRecord.reps, PersonalRecord.weight).where(
+                PersonalRecord.athlete_id == athlete_id,
+                tuple_(PersonalRecord.exercise_id, PersonalRecord.reps).in_(list(lifts))
             )
-            pr_to_return = create_pr(db, obj_in=pr_data_create, athlete_id=athlete_id)
-            new_or_updated_pr_achieved = True
+        )
+    }
+    candidates = {key: lift for key, lift in lifts.items()
+                  if key not in current or lift[0] > current[key]}
+    if not candidates:
+        return []
+
+    stmt = insert(PersonalRecord).values([
+        dict(athlete_id=athlete_id, exercise_id=exercise_id, reps=reps, weight=weight,
+             date_achieved=date_achieved, workout_log_id=workout_log_id)
+        for (exercise_id, reps), (weight, date_achieved, workout_log_id) in sorted(candidates.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_athlete_exercise_reps",
+        set_=dict(weight=stmt.excluded.weight, date_achieved=stmt.excluded.date_achieved,
+                  workout_log_id=stmt.excluded.workout_log_id),
+        # Re-checked under the row lock, so a record raised since the SELECT
+        # (e.g. by a parallel log) is never lowered
+        where=stmt.excluded.weight > PersonalRecord.weight
+    ).returning(PersonalRecord)
+    improved = list(db.scalars(stmt, execution_options={"populate_existing": True}))
+    record_history(db, improved)
+    return improved
+
+def record_history(db: Session, prs: List[PersonalRecord]) -> None:
+    """Appends the new state of changed PRs to personal_record_history. The caller commits."""
+    if prs:
+        db.execute(insert(PersonalRecordHistory).values([
+            dict(athlete_id=pr.athlete_id, exercise_id=pr.exercise_id, reps=pr.reps, weight=pr.weight,
+                 date_achieved=pr.date_achieved, workout_log_id=pr.workout_log_id)
+            for pr in prs
+        ]))
+
+def upsert_prs(
+    db: Session,
+    *,
+    athlete_id: int,
+    exercise_id: int,
+    best_weights: Dict[int, float],
+    date_achieved: datetime.date,
+    workout_log_id: Optional[int] = None
+) -> List[PersonalRecord]:
+    """upsert_prs_batch for the rep counts of a single exercise."""
+    return upsert_prs_batch(db, athlete_id=athlete_id, lifts={
+        (exercise_id, reps): (weight, date_achieved, workout_log_id)
+        for reps, weight in best_weights.items()
+    })
+
+# Rebuilds the PRs within a scope from the workout logs in one statement: the
+# best lift per (athlete, exercise, reps) (earliest log on ties, as when logged
+# in order) is upserted, and PRs in scope without any remaining lift are deleted;
+# both are appended to personal_record_history. Returns (PRs changed, PRs deleted).
+_REFRESH_PRS_SQL = """
+    WITH best AS ({best}), upserted AS (
+        INSERT INTO personal_records AS pr
+               (athlete_id, exercise_id, reps, weight, date_achieved, workout_log_id)
+        SELECT athlete_id, exercise_id, reps, weight, date_achieved, workout_log_id FROM best
+        ON CONFLICT ON CONSTRAINT uq_athlete_exercise_reps DO UPDATE
+        SET weight = excluded.weight, date_achieved = excluded.date_achieved,
+            workout_log_id = excluded.workout_log_id
+        WHERE (pr.weight, pr.date_achieved, pr.workout_log_id)
+              IS DISTINCT FROM (excluded.weight, excluded.date_achieved, excluded.workout_log_id)
+        RETURNING pr.athlete_id, pr.exercise_id, pr.reps, pr.weight, pr.date_achieved, pr.workout_log_id
+    ), deleted AS (
+        DELETE FROM personal_records pr
+        WHERE {pr_scope}
+          AND NOT EXISTS (SELECT 1 FROM best b WHERE b.athlete_id = pr.athlete_id
+                          AND b.exercise_id = pr.exercise_id AND b.reps = pr.reps)
+        RETURNING pr.athlete_id, pr.exercise_id, pr.reps
+    ), history AS (
+        INSERT INTO personal_record_history
+               (athlete_id, exercise_id, reps, weight, date_achieved, workout_log_id)
+        SELECT athlete_id, exercise_id, reps, weight, date_achieved, workout_log_id FROM upserted
+        UNION ALL
+        SELECT athlete_id, exercise_id, reps, NULL, NULL, NULL FROM deleted
+    )
+    SELECT (SELECT count(*) FROM upserted), (SELECT count(*) FROM deleted)
+"""
+
+# Best lifts from the per-set arrays of the workout logs
+_BEST_FROM_LOGS = """
+        SELECT DISTINCT ON (wl.athlete_id, ped.exercise_id, s.reps)
+               wl.athlete_id, ped.exercise_id, s.reps, s.weight,
+               COALESCE(wl.date_performed::date, CURRENT_DATE) AS date_achieved,
+               wl.id AS workout_log_id
+        FROM workout_logs wl
+        JOIN plan_exercise_details ped ON ped.id = wl.plan_exercise_details_id
+        CROSS JOIN LATERAL unnest(wl.reps_performed_per_set, wl.weight_kg_per_set) AS s(reps, weight)
+        WHERE {scope}
+          AND s.reps > 0 AND s.weight > 0
+          AND cardinality(wl.reps_performed_per_set) = wl.sets_performed
+          AND cardinality(wl.weight_kg_per_set) = wl.sets_performed
+        ORDER BY wl.athlete_id, ped.exercise_id, s.reps, s.weight DESC, wl.date_performed, wl.id
+"""
+
+# The same from workout_sets (WORKOUT_SETS_DUAL_WRITE), in the order of
+# ix_workout_sets_athlete_id_exercise_id_reps so no log is unnested
+_BEST_FROM_SETS = """
+        SELECT DISTINCT ON (ws.athlete_id, ws.exercise_id, ws.reps)
+               ws.athlete_id, ws.exercise_id, ws.reps, ws.weight_kg AS weight,
+               COALESCE(ws.performed_at::date, CURRENT_DATE) AS date_achieved,
+               ws.workout_log_id
+        FROM workout_sets ws
+        WHERE {scope}
+          AND ws.reps > 0 AND ws.weight_kg > 0
+        ORDER BY ws.athlete_id, ws.exercise_id, ws.reps, ws.weight_kg DESC,
+                 ws.performed_at, ws.workout_log_id
+"""
+
+def _refresh_prs_sql(best: str, scope: str, pr_scope: str):
+    return text(_REFRESH_PRS_SQL.format(best=best.format(scope=scope), pr_scope=pr_scope))
 
-    return pr_to_return, new_or_updated_pr_achieved
+def _pr_source() -> str:
+    """Where PR recomputes read the logged lifts from."""
+    return "workout_sets" if settings.WORKOUT_SETS_DUAL_WRITE else "workout_logs"
+
+# The keys whose PR the given log holds
+_HELD_KEYS = """(SELECT exercise_id, reps FROM personal_records
+              WHERE athlete_id = :athlete_id AND workout_log_id = :workout_log_id)"""
+_LOG_PR_SCOPE = "pr.athlete_id = :athlete_id AND pr.workout_log_id = :workout_log_id"
+_LOG_SCOPE_SQL = {
+    "workout_logs": _refresh_prs_sql(_BEST_FROM_LOGS, f"""wl.athlete_id = :athlete_id AND wl.id <> :exclude_log_id
+          AND (ped.exercise_id, s.reps) IN {_HELD_KEYS}""", _LOG_PR_SCOPE),
+    "workout_sets": _refresh_prs_sql(_BEST_FROM_SETS, f"""ws.athlete_id = :athlete_id AND ws.workout_log_id <> :exclude_log_id
+          AND (ws.exercise_id, ws.reps) IN {_HELD_KEYS}""", _LOG_PR_SCOPE),
+}
+
+# All keys of the given athletes
+_ATHLETES_SCOPE_SQL = {
+    "workout_logs": _refresh_prs_sql(
+        _BEST_FROM_LOGS, "wl.athlete_id = ANY(:athlete_ids)", "pr.athlete_id = ANY(:athlete_ids)"),
+    "workout_sets": _refresh_prs_sql(
+        _BEST_FROM_SETS, "ws.athlete_id = ANY(:athlete_ids)", "pr.athlete_id = ANY(:athlete_ids)"),
+}
+
+REBUILD_BATCH_SIZE = 200
+
+def recompute_prs_for_log(db: Session, workout_log: WorkoutLog, *, deleting: bool = False) -> Tuple[int, int]:
+    """
+    Recomputes the PRs held by a corrected (flushed) or about-to-be-deleted log
+    from the athlete's remaining logs, in one statement that only aggregates
+    the affected (exercise, reps) keys. PRs the corrected log now beats are
+    not raised here; run upsert_prs_batch for its lifts afterwards.
+    Reads workout_sets when WORKOUT_SETS_DUAL_WRITE is on (and backfilled).
+    Returns (PRs changed, PRs deleted). The caller commits.
+    """
+    return tuple(db.execute(_LOG_SCOPE_SQL[_pr_source()], {
+        "athlete_id": workout_log.athlete_id,
+        "workout_log_id": workout_log.id,
+        "exclude_log_id": workout_log.id if deleting else 0,
+    }).one())
+
+def rebuild_prs(db: Session, *, batch_size: int = REBUILD_BATCH_SIZE) -> Iterator[Dict[str, int]]:
+    """
+    Recomputes every athlete's PRs from their workout logs with set-based SQL,
+    one committed statement per batch of athletes. Yields progress after each
+    batch: athletes done/total and PRs changed/deleted so far.
+    """
+    athlete_ids = list(db.scalars(
+        select(WorkoutLog.athlete_id).union(select(PersonalRecord.athlete_id)).order_by(text("1"))))
+    progress = {"athletes_done": 0, "athletes_total": len(athlete_ids), "changed": 0, "deleted": 0}
+    for start in range(0, len(athlete_ids), batch_size):
+        batch = athlete_ids[start:start + batch_size]
+        changed, deleted = db.execute(
+            _ATHLETES_SCOPE_SQL[_pr_source()], {"athlete_ids": batch}).one()
+        db.commit()
+        progress.update(athletes_done=start + len(batch), changed=progress["changed"] + changed,
+                        deleted=progress["deleted"] + deleted)
+        yield dict(progress)
+
+# Rep counts covered by the rep-max curve (1RM..20RM)
+REP_MAX_CURVE_REPS = 20
+
+async def get_pr_history_async(
+    db: AsyncSession, athlete_id: int, *, exercise_id: Optional[int] = None,
+    max_reps: int = REP_MAX_CURVE_REPS
+) -> List[Tuple[PersonalRecordHistory, Optional[float]]]:
+    """
+    An athlete's PR history for 1..max_reps reps, each row with the exercise's
+    best e1RM, ordered by exercise, reps and recording order: one range scan
+    of the history index.
+    """
+    query = select(PersonalRecordHistory, ExerciseBestE1RM.best_e1rm).outerjoin(
+        ExerciseBestE1RM, and_(ExerciseBestE1RM.athlete_id == PersonalRecordHistory.athlete_id,
+                               ExerciseBestE1RM.exercise_id == PersonalRecordHistory.exercise_id)
+    ).where(
+        PersonalRecordHistory.athlete_id == athlete_id,
+        PersonalRecordHistory.reps.between(1, max_reps)
+    )
+    if exercise_id is not None:
+        query = query.where(PersonalRecordHistory.exercise_id == exercise_id)
+    result = await db.execute(query.order_by(
+        PersonalRecordHistory.exercise_id, PersonalRecordHistory.reps, PersonalRecordHistory.id))
+    return result.all()
+
+def rep_max_curves(history: List[Tuple[PersonalRecordHistory, Optional[float]]]) -> List[Dict[str, Any]]:
+    """
+    Groups PR history rows (as ordered by get_pr_history_async) per exercise into
+    its best e1RM, the current rep-max curve (the latest recorded weight per
+    rep count) and the timeline of every recorded change, oldest first.
+    """
+    curves: Dict[int, Dict[str, Any]] = {}
+    for row, best_e1rm in history:
+        exercise = curves.setdefault(row.exercise_id, {
+            "exercise_id": row.exercise_id, "best_e1rm": best_e1rm, "curve": {}, "timeline": []})
+        exercise["curve"][row.reps] = row
+        exercise["timeline"].append(row)
+    for exercise in curves.values():
+        exercise["curve"] = [row for row in exercise["curve"].values() if row.weight is not None]
+        exercise["timeline"].sort(key=lambda row: row.id)
+    return list(curves.values())
@@ -0,0 +1,97 @@
+import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.workout_log import WorkoutLog
+from app.models.workout_set import WorkoutSet
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def set_rows(workout_log: WorkoutLog, exercise_id: int) -> List[Dict[str, Any]]:
+    """workout_sets rows for a log, one per entry of its per-set arrays."""
+    weights = workout_log.weight_kg_per_set or []
+    rests = workout_log.rest_taken_per_set or []
+    return [
+        dict(workout_log_id=workout_log.id, athlete_id=workout_log.athlete_id,
+             exercise_id=exercise_id, performed_at=workout_log.date_performed,
+             set_number=number, reps=reps,
+             weight_kg=weights[number - 1] if number <= len(weights) else None,
+             rest_seconds=rests[number - 1] if number <= len(rests) else None)
+        for number, reps in enumerate(workout_log.reps_performed_per_set, start=1)
+    ]
+
+
+def write_sets(db: Session, logs: Iterable[Tuple[WorkoutLog, int]], *, replace: bool = False) -> None:
+    """
+    Dual-write of (flushed workout log, exercise_id) pairs into workout_sets
+    with one batched INSERT; with `replace` (log updates) the logs' current
+    rows are deleted first. No-op unless WORKOUT_SETS_DUAL_WRITE. The caller
+    commits, together with the logs.
+    """
+    if not settings.WORKOUT_SETS_DUAL_WRITE:
+        return
+    logs = list(logs)
+    if replace and logs:
+        db.execute(delete(WorkoutSet).where(
+            WorkoutSet.workout_log_id.in_([workout_log.id for workout_log, _ in logs])))
+    rows = [row for workout_log, exercise_id in logs for row in set_rows(workout_log, exercise_id)]
+    if rows:
+        db.execute(insert(WorkoutSet), rows)
+
+
+def replace_sets(db: Session, workout_log: WorkoutLog) -> None:
+    """Rewrites the workout_sets rows of an updated log (no-op unless WORKOUT_SETS_DUAL_WRITE)."""
+    if not settings.WORKOUT_SETS_DUAL_WRITE:
+        return
+    write_sets(db, [(workout_log, workout_log.plan_exercise_details.exercise_id)], replace=True)
+
+
+def training_volume(
+    db: Session,
+    *,
+    athlete_id: int,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None
+) -> List[Tuple[int, int, int, float]]:
+    """(exercise_id, sets, reps, volume in kg) of an athlete, optionally within a date range."""
+    query = select(
+        WorkoutSet.exercise_id,
+        func.count(),
+        func.sum(WorkoutSet.reps),
+        func.coalesce(func.sum(WorkoutSet.reps * WorkoutSet.weight_kg), 0)
+    ).where(WorkoutSet.athlete_id == athlete_id)
+    if start:
+        query = query.where(WorkoutSet.performed_at >= start)
+    if end:
+        query = query.where(WorkoutSet.performed_at <= end)
+    return [tuple(row) for row in db.execute(query.group_by(WorkoutSet.exercise_id))]
+
+
+_BACKFILL_SQL = text("""
+    INSERT INTO workout_sets (workout_log_id, athlete_id, exercise_id, performed_at,
+                              set_number, reps, weight_kg, rest_seconds)
+    SELECT wl.id, wl.athlete_id, ped.exercise_id, wl.date_performed,
+           s.n, s.reps, wl.weight_kg_per_set[s.n], wl.rest_taken_per_set[s.n]
+    FROM workout_logs wl
+    JOIN plan_exercise_details ped ON ped.id = wl.plan_exercise_details_id
+    CROSS JOIN LATERAL unnest(wl.reps_performed_per_set) WITH ORDINALITY AS s(reps, n)
+    WHERE wl.id >= :start AND wl.id < :end
+      AND NOT EXISTS (SELECT 1 FROM workout_sets ws WHERE ws.workout_log_id = wl.id)
+""")
+
+
+def backfill_workout_sets(db: Session, *, batch_size: int = BACKFILL_BATCH_SIZE) -> Iterator[Tuple[int, int, int]]:
+    """
+    Fills workout_sets for logs that have no rows yet, in set-based INSERT ...
+    SELECT batches of log ids, each committed on its own; safe to re-run.
+    Yields (last log id done, max log id, rows inserted) after each batch.
+    """
+    max_id = db.scalar(select(func.max(WorkoutLog.id))) or 0
+    for start in range(0, max_id + 1, batch_size):
+        inserted = db.execute(_BACKFILL_SQL, {"start": start, "end": start + batch_size}).rowcount
+        db.commit()
+        yield min(start + batch_size - 1, max_id), max_id, inserted
@@ -6,7 +6,8 @@ from app.models.user import User
 from app.models.exercise import Exercise
 from app.models.plan import Plan, PlanAssignment, PlanExerciseDetails
 from app.models.workout_log import WorkoutLog
+from app.models.workout_set import WorkoutSet
 from app.models.nutrition_plan import NutritionPlan, NutritionPlanAssignment
 
 # Import the new PersonalRecord model
-from app.models.pr import PersonalRecord
+from app.models.pr import PersonalRecord, PersonalRecordHistory, ExerciseBestE1RM
@@ -1,10 +1,10 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse
 
-from app.core.database import get_db
-from app.core.init_db import init_db
-from app.routers import auth, users, exercises, plans, workout_logs, nutrition_plans, pr
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import PasswordHashingBusy
+from app.routers import auth, users, exercises, plans, workout_logs, nutrition_plans, pr, health
 
 app = FastAPI(
     title="AppDelPalestrato",
@@ -19,6 +19,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -32,12 +33,16 @@ app.include_router(workout_logs.router,
 app.include_router(nutrition_plans.router,
                    prefix="/api/v1/nutrition-plans", tags=["nutrition-plans"])
 app.include_router(pr.router, prefix="/api/v1/prs", tags=["personal-records"])
+app.include_router(health.router, prefix="/health", tags=["health"])
 
 
-@app.on_event("startup")
-async def startup_event():
-    db = next(get_db())
-    init_db(db)
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication service is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
 
 
 @app.get("/")
@@ -16,7 +16,7 @@ class NutritionPlan(Base):
     total_carbs = Column(Float, default=0)
     total_fats = Column(Float, default=0)
     created_by_user_id = Column(
-        Integer, ForeignKey("users.id"), nullable=False)
+        Integer, ForeignKey("users.id"), nullable=False, index=True)
 
     # Relationships
     created_by = relationship("User", back_populates="created_nutrition_plans")
@@ -31,7 +31,7 @@ class Meal(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     nutrition_plan_id = Column(Integer, ForeignKey(
-        "nutrition_plans.id"), nullable=False)
+        "nutrition_plans.id"), nullable=False, index=True)
     name = Column(String, nullable=False)  # e.g., "Breakfast", "Lunch"
     time = Column(String, nullable=False)  # e.g., "08:00"
     order_in_plan = Column(Integer, nullable=False)
@@ -50,7 +50,7 @@ class FoodItem(Base):
     __tablename__ = "food_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    meal_id = Column(Integer, ForeignKey("meals.id"), nullable=False)
+    meal_id = Column(Integer, ForeignKey("meals.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     quantity = Column(String, nullable=False)  # e.g., "100g", "1 cup"
     calories = Column(Float, nullable=False)
@@ -69,9 +69,10 @@ class NutritionPlanAssignment(Base):
     id = Column(Integer, primary_key=True, index=True)
     nutrition_plan_id = Column(Integer, ForeignKey(
         "nutrition_plans.id"), nullable=False)
-    athlete_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    athlete_id = Column(Integer, ForeignKey(
+        "users.id"), nullable=False, index=True)
     assigned_by_coach_id = Column(
-        Integer, ForeignKey("users.id"), nullable=False)
+        Integer, ForeignKey("users.id"), nullable=False, index=True)
     assigned_date = Column(DateTime, default=datetime.utcnow)
     start_date = Column(DateTime, nullable=True)
     # assigned, in_progress, completed, cancelled
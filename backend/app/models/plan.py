@@ -27,7 +27,7 @@ class Plan(Base):
     description = Column(String)
     difficulty_level = Column(Enum(PlanDifficulty), nullable=False)
     created_by_user_id = Column(
-        Integer, ForeignKey("users.id"), nullable=False)
+        Integer, ForeignKey("users.id"), nullable=False, index=True)
 
     # Relationships
     created_by = relationship("User", back_populates="created_plans")
@@ -40,7 +40,7 @@ class PlanExerciseDetails(Base):
     __tablename__ = "plan_exercise_details"
 
     id = Column(Integer, primary_key=True, index=True)
-    plan_id = Column(Integer, ForeignKey("plans.id"), nullable=False)
+    plan_id = Column(Integer, ForeignKey("plans.id"), nullable=False, index=True)
     exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=False)
     sets = Column(String, nullable=False)  # e.g., "3-4"
     reps = Column(String, nullable=False)  # e.g., "8-12"
@@ -60,9 +60,10 @@ class PlanAssignment(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     plan_id = Column(Integer, ForeignKey("plans.id"), nullable=False)
-    athlete_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    athlete_id = Column(Integer, ForeignKey(
+        "users.id"), nullable=False, index=True)
     assigned_by_coach_id = Column(
-        Integer, ForeignKey("users.id"), nullable=False)
+        Integer, ForeignKey("users.id"), nullable=False, index=True)
     assigned_date = Column(DateTime, default=datetime.utcnow)
     start_date = Column(DateTime, nullable=True)
     status = Column(Enum(PlanAssignmentStatus),
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, Float, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Float, UniqueConstraint, Index, func, select
+from sqlalchemy.orm import column_property, relationship
 from app.core.database import Base
 import datetime
 
@@ -21,5 +21,63 @@ class PersonalRecord(Base):
     exercise = relationship("Exercise", back_populates="personal_records")
     workout_log = relationship("WorkoutLog", back_populates="personal_records")
 
-    __table_args__ = (UniqueConstraint(
-        'athlete_id', 'exercise_id', 'reps', name='uq_athlete_exercise_reps'),)
+    __table_args__ = (
+        UniqueConstraint(
+            'athlete_id', 'exercise_id', 'reps', name='uq_athlete_exercise_reps'),
+        # Serves the athlete's PR list, newest first
+        Index('ix_personal_records_athlete_id_date_achieved',
+              'athlete_id', date_achieved.desc(), id),
+    )
+
+
+# Append-only log of every change to a personal record, written by the PR engine
+# (app.crud.crud_pr): the latest row per (athlete, exercise, reps) mirrors
+# personal_records, earlier rows are the PR timeline. weight is NULL when the
+# record was removed because no logged lift remains for it.
+class PersonalRecordHistory(Base):
+    __tablename__ = "personal_record_history"
+
+    id = Column(Integer, primary_key=True)
+    athlete_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=False)
+    reps = Column(Integer, nullable=False)
+    weight = Column(Float, nullable=True)
+    date_achieved = Column(Date, nullable=True)
+    workout_log_id = Column(Integer, ForeignKey(
+        "workout_logs.id", ondelete="SET NULL"), nullable=True)
+    recorded_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # Rep-max curve and timeline of an athlete, per exercise, in one range scan
+        Index('ix_personal_record_history_athlete_id_exercise_id_reps',
+              'athlete_id', 'exercise_id', 'reps', id),
+    )
+
+
+# Best estimated 1RM per athlete and exercise (formula: settings.E1RM_FORMULA),
+# raised on each new log by app.crud.crud_e1rm and rebuilt by scripts.rebuild_prs
+class ExerciseBestE1RM(Base):
+    __tablename__ = "exercise_best_e1rms"
+
+    id = Column(Integer, primary_key=True)
+    athlete_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=False)
+    best_e1rm = Column(Float, nullable=False)
+    date_achieved = Column(Date, nullable=False)
+    workout_log_id = Column(Integer, ForeignKey(
+        "workout_logs.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint(
+            'athlete_id', 'exercise_id', name='uq_exercise_best_e1rms_athlete_exercise'),
+    )
+
+
+# The exercise's best e1RM next to each PR; deferred, load it with undefer()
+PersonalRecord.best_e1rm = column_property(
+    select(ExerciseBestE1RM.best_e1rm).where(
+        ExerciseBestE1RM.athlete_id == PersonalRecord.athlete_id,
+        ExerciseBestE1RM.exercise_id == PersonalRecord.exercise_id
+    ).scalar_subquery(),
+    deferred=True
+)
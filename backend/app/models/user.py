@@ -20,7 +20,8 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     role = Column(Enum(UserRole), nullable=False)
     is_active = Column(Boolean, default=True)
-    coach_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    coach_id = Column(Integer, ForeignKey(
+        "users.id"), nullable=True, index=True)
 
     # Relationships
     athletes = relationship("User", backref="coach", remote_side=[id])
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, ARRAY, Index, Numeric, text
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 
 from app.core.database import Base
+from app.core.units import weights_to_kg
 
 
 class WorkoutLog(Base):
@@ -10,20 +11,27 @@ class WorkoutLog(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     plan_assignment_id = Column(Integer, ForeignKey(
-        "plan_assignments.id"), nullable=False)
+        "plan_assignments.id"), nullable=False, index=True)
     plan_exercise_details_id = Column(Integer, ForeignKey(
-        "plan_exercise_details.id"), nullable=False)
+        "plan_exercise_details.id"), nullable=False, index=True)
     athlete_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    date_performed = Column(DateTime, default=datetime.utcnow)
+    # Keyset pagination key of the history, hence NOT NULL
+    date_performed = Column(DateTime, nullable=False, default=datetime.utcnow,
+                            server_default=text("(now() AT TIME ZONE 'utc')"))
     sets_performed = Column(Integer, nullable=False)
     reps_performed_per_set = Column(
         ARRAY(Integer), nullable=False)  # e.g., [10, 9, 8]
     # e.g., ["50", "50", "55"]
     weight_used_per_set = Column(ARRAY(String), nullable=False)
+    # Same weights in kg, kept in sync with weight_used_per_set so volume and
+    # PR queries can aggregate in SQL
+    weight_kg_per_set = Column(ARRAY(Numeric(7, 2, asdecimal=False)), nullable=True)
     rest_taken_per_set = Column(
         ARRAY(Integer), nullable=True)  # e.g., [60, 60, 60]
     athlete_notes = Column(String)
     duration_seconds = Column(Integer)
+    # Client-generated key (e.g. a UUID) that makes offline retries idempotent
+    idempotency_key = Column(String(64), nullable=True)
 
     # Relationships
     plan_assignment = relationship(
@@ -33,3 +41,17 @@ class WorkoutLog(Base):
     athlete = relationship("User", back_populates="workout_logs")
     personal_records = relationship(
         "PersonalRecord", back_populates="workout_log")
+
+    @validates("weight_used_per_set")
+    def _sync_weight_kg(self, key, weights):
+        self.weight_kg_per_set = weights_to_kg(weights)
+        return weights
+
+    __table_args__ = (
+        # Serves per-athlete history filtered by date and ordered newest first
+        Index("ix_workout_logs_athlete_id_date_performed",
+              "athlete_id", date_performed.desc(), id.desc()),
+        # One log per client key and athlete; NULL keys never conflict
+        Index("uq_workout_logs_athlete_id_idempotency_key",
+              "athlete_id", "idempotency_key", unique=True),
+    )
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Numeric, Index
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+
+# One row per set of a workout log, mirroring its per-set arrays (written when
+# WORKOUT_SETS_DUAL_WRITE is on), so set-level PR and volume queries are indexed SQL
+class WorkoutSet(Base):
+    __tablename__ = "workout_sets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    workout_log_id = Column(Integer, ForeignKey(
+        "workout_logs.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Denormalized from the log so set queries need no joins
+    athlete_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=False)
+    performed_at = Column(DateTime, nullable=True)
+    set_number = Column(Integer, nullable=False)  # 1-based
+    reps = Column(Integer, nullable=False)
+    weight_kg = Column(Numeric(7, 2, asdecimal=False), nullable=True)
+    rest_seconds = Column(Integer, nullable=True)
+
+    # Relationships
+    workout_log = relationship("WorkoutLog")
+
+    __table_args__ = (
+        # PR lookups: best weight per (athlete, exercise, reps)
+        Index("ix_workout_sets_athlete_id_exercise_id_reps",
+              "athlete_id", "exercise_id", "reps", weight_kg.desc()),
+        # Training volume over a date range
+        Index("ix_workout_sets_athlete_id_performed_at", "athlete_id", "performed_at"),
+    )
@@ -7,8 +7,11 @@ from pydantic import BaseModel
 
 from app.core.database import get_db
 from app.core.security import (
+    PasswordHashingBusy,
     verify_password,
     get_password_hash,
+    password_needs_rehash,
+    access_token_claims,
     create_access_token,
     create_refresh_token,
     verify_token
@@ -31,6 +34,17 @@ def authenticate_user(db: Session, email: str, password: str) -> User:
     user = db.query(User).filter(User.email == email).first()
     if not user or not verify_password(password, user.hashed_password):
         return None
+
+    # Transparently migrate the hash to the configured cost. Best effort: when
+    # the hashing pool is saturated the old hash is kept and the next login retries.
+    if settings.PASSWORD_REHASH_ON_LOGIN and password_needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = get_password_hash(password)
+        except PasswordHashingBusy:
+            return user
+        db.add(user)
+        db.commit()
+        db.refresh(user)
     return user
 
 
@@ -91,9 +105,7 @@ def login(
             detail="Inactive user"
         )
 
-    access_token = create_access_token(
-        data={"sub": user.email, "role": user.role}
-    )
+    access_token = create_access_token(data=access_token_claims(user))
     refresh_token = create_refresh_token(
         data={"sub": user.email, "role": user.role}
     )
@@ -132,9 +144,7 @@ def refresh_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = create_access_token(
-        data={"sub": user.email, "role": user.role}
-    )
+    access_token = create_access_token(data=access_token_claims(user))
     new_refresh_token = create_refresh_token(
         data={"sub": user.email, "role": user.role}
     )
@@ -177,5 +187,6 @@ def reset_password(
     # 1. Verify the reset token
     # 2. Check if it's expired
     # 3. Update the user's password
+    # 4. Drop the cached principal: invalidate_user(user_id=user.id, email=user.email)
 
     return {"message": "Password updated successfully"}
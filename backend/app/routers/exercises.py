@@ -1,37 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Any
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Any, Optional
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_async_read_db
+from app.core.pagination import keyset, set_next_cursor
 from app.core.security import oauth2_scheme, verify_token
 from app.models.user import User, UserRole
 from app.models.exercise import Exercise
 from app.schemas.exercise import Exercise as ExerciseSchema, ExerciseCreate, ExerciseUpdate
-from app.routers.users import get_current_active_user, check_admin_permission, check_coach_permission
+from app.routers.users import get_current_active_user_async, check_coach_permission_async
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[ExerciseSchema])
-def read_exercises(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def read_exercises(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve exercises.
+    Supports keyset pagination through `cursor` (see X-Next-Cursor).
     """
-    exercises = db.query(Exercise).offset(skip).limit(limit).all()
+    query = keyset(select(Exercise), cursor, Exercise.id)
+    result = await db.execute(query.offset(0 if cursor else skip).limit(limit))
+    exercises = result.scalars().all()
+    set_next_cursor(response, exercises, limit, Exercise.id)
     return exercises
 
 
 @router.post("/", response_model=ExerciseSchema)
-def create_exercise(
+async def create_exercise(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     exercise_in: ExerciseCreate,
-    current_user: User = Depends(check_coach_permission),
+    current_user: User = Depends(check_coach_permission_async),
 ) -> Any:
     """
     Create new exercise.
@@ -41,23 +49,23 @@ def create_exercise(
         created_by_user_id=current_user.id
     )
     db.add(exercise)
-    db.commit()
-    db.refresh(exercise)
+    await db.commit()
+    await db.refresh(exercise)
     return exercise
 
 
 @router.put("/{exercise_id}", response_model=ExerciseSchema)
-def update_exercise(
+async def update_exercise(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     exercise_id: int,
     exercise_in: ExerciseUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Update an exercise.
     """
-    exercise = db.query(Exercise).filter(Exercise.id == exercise_id).first()
+    exercise = await db.get(Exercise, exercise_id)
     if not exercise:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -75,22 +83,22 @@ def update_exercise(
         setattr(exercise, field, value)
 
     db.add(exercise)
-    db.commit()
-    db.refresh(exercise)
+    await db.commit()
+    await db.refresh(exercise)
     return exercise
 
 
 @router.delete("/{exercise_id}", response_model=ExerciseSchema)
-def delete_exercise(
+async def delete_exercise(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     exercise_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Delete an exercise.
     """
-    exercise = db.query(Exercise).filter(Exercise.id == exercise_id).first()
+    exercise = await db.get(Exercise, exercise_id)
     if not exercise:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -104,6 +112,6 @@ def delete_exercise(
             detail="Not enough permissions"
         )
 
-    db.delete(exercise)
-    db.commit()
+    await db.delete(exercise)
+    await db.commit()
     return exercise
@@ -0,0 +1,45 @@
+import time
+from typing import Any
+
+from fastapi import APIRouter, Depends, Response, status
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.database import async_engine, get_db, pool_status, replica_engines
+from app.models.user import User
+from app.routers.users import check_admin_permission
+
+router = APIRouter()
+
+
+@router.get("/db", response_model=dict)
+def read_db_health(response: Response, db: Session = Depends(get_db)) -> Any:
+    """
+    Database connectivity, answered with 503 when the database is unreachable
+    so load balancers and orchestrators can act on the status code.
+    """
+    start = time.perf_counter()
+    try:
+        db.execute(text("SELECT 1"))
+        db_status = "ok"
+    except Exception:
+        db_status = "unavailable"
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "status": db_status,
+        "latency_ms": round(latency_ms, 2),
+    }
+
+
+@router.get("/db/pools", response_model=dict)
+def read_db_pools(current_user: User = Depends(check_admin_permission)) -> Any:
+    """
+    Live connection pool checkout stats of the primary, async and replica engines.
+    """
+    return {
+        "pool": pool_status(),
+        "async_pool": pool_status(async_engine),
+        "replica_pools": [pool_status(replica_engine) for replica_engine in replica_engines],
+    }
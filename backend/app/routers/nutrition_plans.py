@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Any
-
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Any, Optional
+
+from app.core.database import get_async_db, get_async_read_db
+from app.core.pagination import keyset, set_next_cursor
+from app.core.query_budget import query_budget
 from app.core.security import oauth2_scheme, verify_token
 from app.models.user import User, UserRole
 from app.models.nutrition_plan import NutritionPlan, Meal, FoodItem, NutritionPlanAssignment
@@ -20,61 +24,86 @@ from app.schemas.nutrition_plan import (
     NutritionPlanAssignmentCreate,
     NutritionPlanAssignmentUpdate
 )
-from app.routers.users import get_current_active_user, check_admin_permission, check_coach_permission
+from app.routers.users import get_current_active_user_async, check_coach_permission_async
+from app.crud.crud_nutrition import MACROS, apply_macro_delta, macro_delta, macro_totals
 
 router = APIRouter()
 
+# Query budget of read_nutrition_plans: auth lookup + plans + meals + food items
+READ_NUTRITION_PLANS_QUERY_BUDGET = 4
+
+
+def _nutrition_plans_with_meals():
+    """
+    Nutrition plan query that loads meals and their food items with one
+    batched SELECT per level, however many plans and meals are returned.
+    """
+    return select(NutritionPlan).options(
+        selectinload(NutritionPlan.meals).selectinload(Meal.food_items))
+
 
-def update_meal_totals(meal: Meal) -> None:
-    """Update the total nutritional values for a meal based on its food items."""
-    meal.total_calories = sum(item.calories for item in meal.food_items)
-    meal.total_protein = sum(item.protein for item in meal.food_items)
-    meal.total_carbs = sum(item.carbs for item in meal.food_items)
-    meal.total_fats = sum(item.fats for item in meal.food_items)
+async def _nutrition_plan_with_meals(db: AsyncSession, plan_id: int) -> Optional[NutritionPlan]:
+    result = await db.execute(_nutrition_plans_with_meals().where(NutritionPlan.id == plan_id))
+    return result.scalars().first()
 
 
-def update_plan_totals(plan: NutritionPlan) -> None:
-    """Update the total nutritional values for a plan based on its meals."""
-    plan.total_calories = sum(meal.total_calories for meal in plan.meals)
-    plan.total_protein = sum(meal.total_protein for meal in plan.meals)
-    plan.total_carbs = sum(meal.total_carbs for meal in plan.meals)
-    plan.total_fats = sum(meal.total_fats for meal in plan.meals)
+async def _meal_with_food_items(db: AsyncSession, meal_id: int, plan_id: int) -> Optional[Meal]:
+    result = await db.execute(select(Meal).options(selectinload(Meal.food_items)).where(
+        Meal.id == meal_id,
+        Meal.nutrition_plan_id == plan_id
+    ))
+    return result.scalars().first()
 
 
-@router.get("/", response_model=List[NutritionPlanSchema])
-def read_nutrition_plans(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def _food_item(db: AsyncSession, food_id: int, meal_id: int) -> Optional[FoodItem]:
+    result = await db.execute(select(FoodItem).where(
+        FoodItem.id == food_id,
+        FoodItem.meal_id == meal_id
+    ))
+    return result.scalars().first()
+
+
+@router.get("/", response_model=List[NutritionPlanSchema],
+            dependencies=[Depends(query_budget(READ_NUTRITION_PLANS_QUERY_BUDGET))])
+async def read_nutrition_plans(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve nutrition plans.
+    Supports keyset pagination through `cursor` (see X-Next-Cursor).
     """
     if current_user.role == UserRole.ADMIN:
-        plans = db.query(NutritionPlan).offset(skip).limit(limit).all()
+        query = _nutrition_plans_with_meals()
     elif current_user.role == UserRole.COACH:
-        plans = db.query(NutritionPlan).filter(
+        query = _nutrition_plans_with_meals().where(
             NutritionPlan.created_by_user_id == current_user.id
-        ).offset(skip).limit(limit).all()
+        )
     else:  # ATHLETE
         # Get plans assigned to the athlete
-        assignments = db.query(NutritionPlanAssignment).filter(
+        assigned_plan_ids = select(NutritionPlanAssignment.nutrition_plan_id).where(
             NutritionPlanAssignment.athlete_id == current_user.id
-        ).all()
-        plan_ids = [assignment.nutrition_plan_id for assignment in assignments]
-        plans = db.query(NutritionPlan).filter(
-            NutritionPlan.id.in_(plan_ids)
-        ).offset(skip).limit(limit).all()
+        )
+        query = _nutrition_plans_with_meals().where(
+            NutritionPlan.id.in_(assigned_plan_ids)
+        )
+    result = await db.execute(keyset(query, cursor, NutritionPlan.id).offset(
+        0 if cursor else skip).limit(limit))
+    plans = result.scalars().all()
+    set_next_cursor(response, plans, limit, NutritionPlan.id)
     return plans
 
 
 @router.post("/", response_model=NutritionPlanSchema)
-def create_nutrition_plan(
+async def create_nutrition_plan(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     plan_in: NutritionPlanCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Create new nutrition plan.
@@ -85,58 +114,45 @@ def create_nutrition_plan(
             detail="Only coaches can create nutrition plans"
         )
 
+    # Build the whole plan tree in memory, totals included, so it is written
+    # in one transaction: one INSERT for the plan and one batched
+    # INSERT ... RETURNING each for meals and food items.
+    meals = []
+    for meal_data in plan_in.meals:
+        meals.append(Meal(
+            name=meal_data.name,
+            time=meal_data.time,
+            order_in_plan=meal_data.order_in_plan,
+            food_items=[FoodItem(**food_item_data.dict())
+                        for food_item_data in meal_data.food_items],
+            **macro_totals(meal_data.food_items)
+        ))
+
     plan = NutritionPlan(
         name=plan_in.name,
         description=plan_in.description,
-        created_by_user_id=current_user.id
+        created_by_user_id=current_user.id,
+        meals=meals,
+        **macro_totals([food_item_data for meal_data in plan_in.meals
+                        for food_item_data in meal_data.food_items])
     )
     db.add(plan)
-    db.commit()
-    db.refresh(plan)
-
-    # Create meals and food items
-    for meal_data in plan_in.meals:
-        meal = Meal(
-            nutrition_plan_id=plan.id,
-            name=meal_data.name,
-            time=meal_data.time,
-            order_in_plan=meal_data.order_in_plan
-        )
-        db.add(meal)
-        db.commit()
-        db.refresh(meal)
-
-        for food_item_data in meal_data.food_items:
-            food_item = FoodItem(
-                meal_id=meal.id,
-                **food_item_data.dict()
-            )
-            db.add(food_item)
-
-        db.commit()
-        db.refresh(meal)
-        update_meal_totals(meal)
-
-    db.commit()
-    db.refresh(plan)
-    update_plan_totals(plan)
-    db.commit()
-    db.refresh(plan)
+    await db.commit()
     return plan
 
 
 @router.put("/{plan_id}", response_model=NutritionPlanSchema)
-def update_nutrition_plan(
+async def update_nutrition_plan(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     plan_id: int,
     plan_in: NutritionPlanUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Update a nutrition plan.
     """
-    plan = db.query(NutritionPlan).filter(NutritionPlan.id == plan_id).first()
+    plan = await _nutrition_plan_with_meals(db, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -154,22 +170,22 @@ def update_nutrition_plan(
         setattr(plan, field, value)
 
     db.add(plan)
-    db.commit()
-    db.refresh(plan)
+    await db.commit()
+    # Still loaded with its meals: the async session does not expire on commit
     return plan
 
 
 @router.delete("/{plan_id}", response_model=NutritionPlanSchema)
-def delete_nutrition_plan(
+async def delete_nutrition_plan(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     plan_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Delete a nutrition plan.
     """
-    plan = db.query(NutritionPlan).filter(NutritionPlan.id == plan_id).first()
+    plan = await _nutrition_plan_with_meals(db, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -183,23 +199,23 @@ def delete_nutrition_plan(
             detail="Not enough permissions"
         )
 
-    db.delete(plan)
-    db.commit()
+    await db.delete(plan)
+    await db.commit()
     return plan
 
 
 @router.post("/{plan_id}/meals", response_model=MealSchema)
-def create_meal(
+async def create_meal(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     plan_id: int,
     meal_in: MealCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Add a meal to a nutrition plan.
     """
-    plan = db.query(NutritionPlan).filter(NutritionPlan.id == plan_id).first()
+    plan = await db.get(NutritionPlan, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -217,41 +233,31 @@ def create_meal(
         nutrition_plan_id=plan_id,
         name=meal_in.name,
         time=meal_in.time,
-        order_in_plan=meal_in.order_in_plan
+        order_in_plan=meal_in.order_in_plan,
+        food_items=[FoodItem(**food_item_data.dict())
+                    for food_item_data in meal_in.food_items],
+        **macro_totals(meal_in.food_items)
     )
     db.add(meal)
-    db.commit()
-    db.refresh(meal)
-
-    for food_item_data in meal_in.food_items:
-        food_item = FoodItem(
-            meal_id=meal.id,
-            **food_item_data.dict()
-        )
-        db.add(food_item)
-
-    db.commit()
-    db.refresh(meal)
-    update_meal_totals(meal)
-    update_plan_totals(plan)
-    db.commit()
-    db.refresh(meal)
+    await db.flush()
+    await db.run_sync(apply_macro_delta, macro_delta(new=meal), plan_id=plan_id)
+    await db.commit()
     return meal
 
 
 @router.put("/{plan_id}/meals/{meal_id}", response_model=MealSchema)
-def update_meal(
+async def update_meal(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     plan_id: int,
     meal_id: int,
     meal_in: MealUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Update a meal in a nutrition plan.
     """
-    plan = db.query(NutritionPlan).filter(NutritionPlan.id == plan_id).first()
+    plan = await db.get(NutritionPlan, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -265,10 +271,7 @@ def update_meal(
             detail="Not enough permissions"
         )
 
-    meal = db.query(Meal).filter(
-        Meal.id == meal_id,
-        Meal.nutrition_plan_id == plan_id
-    ).first()
+    meal = await _meal_with_food_items(db, meal_id, plan_id)
     if not meal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -278,28 +281,24 @@ def update_meal(
     for field, value in meal_in.dict(exclude_unset=True).items():
         setattr(meal, field, value)
 
+    # Name, time and order do not affect the totals
     db.add(meal)
-    db.commit()
-    db.refresh(meal)
-    update_meal_totals(meal)
-    update_plan_totals(plan)
-    db.commit()
-    db.refresh(meal)
+    await db.commit()
     return meal
 
 
 @router.delete("/{plan_id}/meals/{meal_id}", response_model=MealSchema)
-def delete_meal(
+async def delete_meal(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     plan_id: int,
     meal_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Remove a meal from a nutrition plan.
     """
-    plan = db.query(NutritionPlan).filter(NutritionPlan.id == plan_id).first()
+    plan = await db.get(NutritionPlan, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -313,43 +312,38 @@ def delete_meal(
             detail="Not enough permissions"
         )
 
-    meal = db.query(Meal).filter(
-        Meal.id == meal_id,
-        Meal.nutrition_plan_id == plan_id
-    ).first()
+    meal = await _meal_with_food_items(db, meal_id, plan_id)
     if not meal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Meal not found"
         )
 
-    db.delete(meal)
-    db.commit()
-    update_plan_totals(plan)
-    db.commit()
+    await db.delete(meal)
+    await db.run_sync(apply_macro_delta, macro_delta(old=meal), plan_id=plan_id)
+    await db.commit()
     return meal
 
 
 @router.post("/meals/{meal_id}/food-items", response_model=FoodItemSchema)
-def create_food_item(
+async def create_food_item(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     meal_id: int,
     food_item_in: FoodItemCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Add a food item to a meal.
     """
-    meal = db.query(Meal).filter(Meal.id == meal_id).first()
+    meal = await db.get(Meal, meal_id)
     if not meal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Meal not found"
         )
 
-    plan = db.query(NutritionPlan).filter(
-        NutritionPlan.id == meal.nutrition_plan_id).first()
+    plan = await db.get(NutritionPlan, meal.nutrition_plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -368,36 +362,33 @@ def create_food_item(
         **food_item_in.dict()
     )
     db.add(food_item)
-    db.commit()
-    db.refresh(food_item)
-    update_meal_totals(meal)
-    update_plan_totals(plan)
-    db.commit()
-    db.refresh(food_item)
+    await db.run_sync(apply_macro_delta, macro_delta(new=food_item),
+                      plan_id=plan.id, meal_id=meal_id)
+    await db.commit()
+    await db.refresh(food_item)
     return food_item
 
 
 @router.put("/meals/{meal_id}/food-items/{food_id}", response_model=FoodItemSchema)
-def update_food_item(
+async def update_food_item(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     meal_id: int,
     food_id: int,
     food_item_in: FoodItemUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Update a food item in a meal.
     """
-    meal = db.query(Meal).filter(Meal.id == meal_id).first()
+    meal = await db.get(Meal, meal_id)
     if not meal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Meal not found"
         )
 
-    plan = db.query(NutritionPlan).filter(
-        NutritionPlan.id == meal.nutrition_plan_id).first()
+    plan = await db.get(NutritionPlan, meal.nutrition_plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -411,49 +402,48 @@ def update_food_item(
             detail="Not enough permissions"
         )
 
-    food_item = db.query(FoodItem).filter(
-        FoodItem.id == food_id,
-        FoodItem.meal_id == meal_id
-    ).first()
+    food_item = await _food_item(db, food_id, meal_id)
     if not food_item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Food item not found"
         )
 
-    for field, value in food_item_in.dict(exclude_unset=True).items():
+    # Food item columns are NOT NULL: an explicit null leaves the value unchanged
+    update_data = {field: value for field, value in food_item_in.dict(exclude_unset=True).items()
+                   if value is not None or FoodItem.__table__.c[field].nullable}
+    delta = {macro: (update_data.get(macro, getattr(food_item, macro)) or 0)
+             - (getattr(food_item, macro) or 0)
+             for macro in MACROS}
+    for field, value in update_data.items():
         setattr(food_item, field, value)
 
     db.add(food_item)
-    db.commit()
-    db.refresh(food_item)
-    update_meal_totals(meal)
-    update_plan_totals(plan)
-    db.commit()
-    db.refresh(food_item)
+    await db.run_sync(apply_macro_delta, delta, plan_id=plan.id, meal_id=meal_id)
+    await db.commit()
+    await db.refresh(food_item)
     return food_item
 
 
 @router.delete("/meals/{meal_id}/food-items/{food_id}", response_model=FoodItemSchema)
-def delete_food_item(
+async def delete_food_item(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     meal_id: int,
     food_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Remove a food item from a meal.
     """
-    meal = db.query(Meal).filter(Meal.id == meal_id).first()
+    meal = await db.get(Meal, meal_id)
     if not meal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Meal not found"
         )
 
-    plan = db.query(NutritionPlan).filter(
-        NutritionPlan.id == meal.nutrition_plan_id).first()
+    plan = await db.get(NutritionPlan, meal.nutrition_plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -467,37 +457,32 @@ def delete_food_item(
             detail="Not enough permissions"
         )
 
-    food_item = db.query(FoodItem).filter(
-        FoodItem.id == food_id,
-        FoodItem.meal_id == meal_id
-    ).first()
+    food_item = await _food_item(db, food_id, meal_id)
     if not food_item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Food item not found"
         )
 
-    db.delete(food_item)
-    db.commit()
-    update_meal_totals(meal)
-    update_plan_totals(plan)
-    db.commit()
+    await db.delete(food_item)
+    await db.run_sync(apply_macro_delta, macro_delta(old=food_item),
+                      plan_id=plan.id, meal_id=meal_id)
+    await db.commit()
     return food_item
 
 
 @router.post("/assignments", response_model=NutritionPlanAssignmentSchema)
-def create_nutrition_plan_assignment(
+async def create_nutrition_plan_assignment(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     assignment_in: NutritionPlanAssignmentCreate,
-    current_user: User = Depends(check_coach_permission),
+    current_user: User = Depends(check_coach_permission_async),
 ) -> Any:
     """
     Assign a nutrition plan to an athlete.
     """
     # Verify the plan exists
-    plan = db.query(NutritionPlan).filter(NutritionPlan.id ==
-                                          assignment_in.nutrition_plan_id).first()
+    plan = await db.get(NutritionPlan, assignment_in.nutrition_plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -505,10 +490,11 @@ def create_nutrition_plan_assignment(
         )
 
     # Verify the athlete exists and is assigned to the current coach
-    athlete = db.query(User).filter(
+    result = await db.execute(select(User).where(
         User.id == assignment_in.athlete_id,
         User.role == UserRole.ATHLETE
-    ).first()
+    ))
+    athlete = result.scalars().first()
     if not athlete:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -527,25 +513,23 @@ def create_nutrition_plan_assignment(
         assigned_by_coach_id=current_user.id
     )
     db.add(assignment)
-    db.commit()
-    db.refresh(assignment)
+    await db.commit()
+    await db.refresh(assignment)
     return assignment
 
 
 @router.put("/assignments/{assignment_id}", response_model=NutritionPlanAssignmentSchema)
-def update_nutrition_plan_assignment(
+async def update_nutrition_plan_assignment(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     assignment_id: int,
     assignment_in: NutritionPlanAssignmentUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Update a nutrition plan assignment.
     """
-    assignment = db.query(NutritionPlanAssignment).filter(
-        NutritionPlanAssignment.id == assignment_id
-    ).first()
+    assignment = await db.get(NutritionPlanAssignment, assignment_id)
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -578,24 +562,22 @@ def update_nutrition_plan_assignment(
             setattr(assignment, field, value)
 
     db.add(assignment)
-    db.commit()
-    db.refresh(assignment)
+    await db.commit()
+    await db.refresh(assignment)
     return assignment
 
 
 @router.delete("/assignments/{assignment_id}", response_model=NutritionPlanAssignmentSchema)
-def delete_nutrition_plan_assignment(
+async def delete_nutrition_plan_assignment(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     assignment_id: int,
-    current_user: User = Depends(check_coach_permission),
+    current_user: User = Depends(check_coach_permission_async),
 ) -> Any:
     """
     Delete a nutrition plan assignment.
     """
-    assignment = db.query(NutritionPlanAssignment).filter(
-        NutritionPlanAssignment.id == assignment_id
-    ).first()
+    assignment = await db.get(NutritionPlanAssignment, assignment_id)
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -609,30 +591,36 @@ def delete_nutrition_plan_assignment(
             detail="Not enough permissions to delete this assignment"
         )
 
-    db.delete(assignment)
-    db.commit()
+    await db.delete(assignment)
+    await db.commit()
     return assignment
 
 
 @router.get("/assignments", response_model=List[NutritionPlanAssignmentSchema])
-def read_nutrition_plan_assignments(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def read_nutrition_plan_assignments(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve nutrition plan assignments.
+    Supports keyset pagination through `cursor` (see X-Next-Cursor).
     """
     if current_user.role == UserRole.ADMIN:
-        assignments = db.query(NutritionPlanAssignment).offset(
-            skip).limit(limit).all()
+        query = select(NutritionPlanAssignment)
     elif current_user.role == UserRole.COACH:
-        assignments = db.query(NutritionPlanAssignment).filter(
+        query = select(NutritionPlanAssignment).where(
             NutritionPlanAssignment.assigned_by_coach_id == current_user.id
-        ).offset(skip).limit(limit).all()
+        )
     else:  # ATHLETE
-        assignments = db.query(NutritionPlanAssignment).filter(
+        query = select(NutritionPlanAssignment).where(
             NutritionPlanAssignment.athlete_id == current_user.id
-        ).offset(skip).limit(limit).all()
+        )
+    result = await db.execute(keyset(query, cursor, NutritionPlanAssignment.id).offset(
+        0 if cursor else skip).limit(limit))
+    assignments = result.scalars().all()
+    set_next_cursor(response, assignments, limit, NutritionPlanAssignment.id)
     return assignments
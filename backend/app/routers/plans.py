@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Any
-
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Any, Optional
+
+from app.core.database import get_async_db, get_async_read_db
+from app.core.pagination import keyset, set_next_cursor
+from app.core.query_budget import query_budget
 from app.core.security import oauth2_scheme, verify_token
 from app.models.user import User, UserRole
 from app.models.plan import Plan, PlanExerciseDetails, PlanAssignment
@@ -17,42 +21,90 @@ from app.schemas.plan import (
     PlanAssignmentCreate,
     PlanAssignmentUpdate
 )
-from app.routers.users import get_current_active_user, check_admin_permission, check_coach_permission
+from app.routers.users import get_current_active_user_async, check_coach_permission_async
 
 router = APIRouter()
 
+# Query budget of read_plans: auth lookup + plans + one batched exercise_details load
+READ_PLANS_QUERY_BUDGET = 3
+# Query budget of update_plan: auth lookup + plan and its details + UPDATE
+UPDATE_PLAN_QUERY_BUDGET = 4
+# Upper bound on plans accepted by POST /plans/batch
+MAX_PLAN_BATCH_SIZE = 200
+
+
+def _plans_with_details():
+    """Plan query that loads exercise_details for all rows in one extra SELECT."""
+    return select(Plan).options(selectinload(Plan.exercise_details))
+
+
+async def _plan_with_details(db: AsyncSession, plan_id: int) -> Optional[Plan]:
+    result = await db.execute(_plans_with_details().where(Plan.id == plan_id))
+    return result.scalars().first()
+
+
+def _build_plan(plan_in: PlanCreate, created_by_user_id: int) -> Plan:
+    """Plan with its exercise details attached, ready to be flushed in one go."""
+    return Plan(
+        name=plan_in.name,
+        description=plan_in.description,
+        difficulty_level=plan_in.difficulty_level,
+        created_by_user_id=created_by_user_id,
+        exercise_details=[
+            PlanExerciseDetails(**exercise_detail.dict())
+            for exercise_detail in plan_in.exercise_details
+        ]
+    )
+
 
-@router.get("/", response_model=List[PlanSchema])
-def read_plans(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def _save_plans(db: AsyncSession, plans: List[Plan]) -> List[Plan]:
+    """
+    Writes plans and their exercise details in a single transaction: one
+    batched INSERT ... RETURNING per table. The response is serialized from
+    the written objects, which the async session does not expire on commit.
+    """
+    db.add_all(plans)
+    await db.commit()
+    return plans
+
+
+@router.get("/", response_model=List[PlanSchema],
+            dependencies=[Depends(query_budget(READ_PLANS_QUERY_BUDGET))])
+async def read_plans(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve plans.
+    Supports keyset pagination through `cursor` (see X-Next-Cursor).
     """
     if current_user.role == UserRole.ADMIN:
-        plans = db.query(Plan).offset(skip).limit(limit).all()
+        query = _plans_with_details()
     elif current_user.role == UserRole.COACH:
-        plans = db.query(Plan).filter(Plan.created_by_user_id ==
-                                      current_user.id).offset(skip).limit(limit).all()
+        query = _plans_with_details().where(
+            Plan.created_by_user_id == current_user.id)
     else:  # ATHLETE
         # Get plans assigned to the athlete
-        assignments = db.query(PlanAssignment).filter(
-            PlanAssignment.athlete_id == current_user.id).all()
-        plan_ids = [assignment.plan_id for assignment in assignments]
-        plans = db.query(Plan).filter(Plan.id.in_(plan_ids)
-                                      ).offset(skip).limit(limit).all()
+        assigned_plan_ids = select(PlanAssignment.plan_id).where(
+            PlanAssignment.athlete_id == current_user.id)
+        query = _plans_with_details().where(Plan.id.in_(assigned_plan_ids))
+    result = await db.execute(keyset(query, cursor, Plan.id).offset(
+        0 if cursor else skip).limit(limit))
+    plans = result.scalars().all()
+    set_next_cursor(response, plans, limit, Plan.id)
     return plans
 
 
 @router.post("/", response_model=PlanSchema)
-def create_plan(
+async def create_plan(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     plan_in: PlanCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Create new plan.
@@ -63,41 +115,47 @@ def create_plan(
             detail="Only coaches can create plans"
         )
 
-    plan = Plan(
-        name=plan_in.name,
-        description=plan_in.description,
-        difficulty_level=plan_in.difficulty_level,
-        created_by_user_id=current_user.id
-    )
-    db.add(plan)
-    db.commit()
-    db.refresh(plan)
-
-    # Create plan exercise details
-    for exercise_detail in plan_in.exercise_details:
-        plan_exercise_detail = PlanExerciseDetails(
-            plan_id=plan.id,
-            **exercise_detail.dict()
+    return (await _save_plans(db, [_build_plan(plan_in, current_user.id)]))[0]
+
+
+@router.post("/batch", response_model=List[PlanSchema])
+async def create_plans_batch(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    plans_in: List[PlanCreate],
+    current_user: User = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Create many plans at once (e.g. importing a season's programming).
+    All plans are created or none is.
+    """
+    if current_user.role != UserRole.COACH:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only coaches can create plans"
+        )
+    if len(plans_in) > MAX_PLAN_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_PLAN_BATCH_SIZE} plans can be created per request"
         )
-        db.add(plan_exercise_detail)
 
-    db.commit()
-    db.refresh(plan)
-    return plan
+    return await _save_plans(db, [_build_plan(plan_in, current_user.id) for plan_in in plans_in])
 
 
-@router.put("/{plan_id}", response_model=PlanSchema)
-def update_plan(
+@router.put("/{plan_id}", response_model=PlanSchema,
+            dependencies=[Depends(query_budget(UPDATE_PLAN_QUERY_BUDGET))])
+async def update_plan(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     plan_id: int,
     plan_in: PlanUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Update a plan.
     """
-    plan = db.query(Plan).filter(Plan.id == plan_id).first()
+    plan = await _plan_with_details(db, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -115,22 +173,22 @@ def update_plan(
         setattr(plan, field, value)
 
     db.add(plan)
-    db.commit()
-    db.refresh(plan)
+    await db.commit()
+    # Still loaded with its details: the async session does not expire on commit
     return plan
 
 
 @router.delete("/{plan_id}", response_model=PlanSchema)
-def delete_plan(
+async def delete_plan(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     plan_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Delete a plan.
     """
-    plan = db.query(Plan).filter(Plan.id == plan_id).first()
+    plan = await _plan_with_details(db, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -144,23 +202,23 @@ def delete_plan(
             detail="Not enough permissions"
         )
 
-    db.delete(plan)
-    db.commit()
+    await db.delete(plan)
+    await db.commit()
     return plan
 
 
 @router.post("/{plan_id}/exercise-details", response_model=PlanExerciseDetailsSchema)
-def create_plan_exercise_detail(
+async def create_plan_exercise_detail(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     plan_id: int,
     exercise_detail_in: PlanExerciseDetailsCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Add an exercise to a plan.
     """
-    plan = db.query(Plan).filter(Plan.id == plan_id).first()
+    plan = await _plan_with_details(db, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -179,24 +237,24 @@ def create_plan_exercise_detail(
         **exercise_detail_in.dict()
     )
     db.add(plan_exercise_detail)
-    db.commit()
-    db.refresh(plan_exercise_detail)
+    await db.commit()
+    await db.refresh(plan_exercise_detail)
     return plan_exercise_detail
 
 
 @router.put("/{plan_id}/exercise-details/{detail_id}", response_model=PlanExerciseDetailsSchema)
-def update_plan_exercise_detail(
+async def update_plan_exercise_detail(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     plan_id: int,
     detail_id: int,
     exercise_detail_in: PlanExerciseDetailsUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Update an exercise in a plan.
     """
-    plan = db.query(Plan).filter(Plan.id == plan_id).first()
+    plan = await _plan_with_details(db, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -210,10 +268,8 @@ def update_plan_exercise_detail(
             detail="Not enough permissions"
         )
 
-    plan_exercise_detail = db.query(PlanExerciseDetails).filter(
-        PlanExerciseDetails.id == detail_id,
-        PlanExerciseDetails.plan_id == plan_id
-    ).first()
+    plan_exercise_detail = next(
+        (detail for detail in plan.exercise_details if detail.id == detail_id), None)
     if not plan_exercise_detail:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -224,23 +280,23 @@ def update_plan_exercise_detail(
         setattr(plan_exercise_detail, field, value)
 
     db.add(plan_exercise_detail)
-    db.commit()
-    db.refresh(plan_exercise_detail)
+    await db.commit()
+    await db.refresh(plan_exercise_detail)
     return plan_exercise_detail
 
 
 @router.delete("/{plan_id}/exercise-details/{detail_id}", response_model=PlanExerciseDetailsSchema)
-def delete_plan_exercise_detail(
+async def delete_plan_exercise_detail(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     plan_id: int,
     detail_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Remove an exercise from a plan.
     """
-    plan = db.query(Plan).filter(Plan.id == plan_id).first()
+    plan = await _plan_with_details(db, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -254,33 +310,31 @@ def delete_plan_exercise_detail(
             detail="Not enough permissions"
         )
 
-    plan_exercise_detail = db.query(PlanExerciseDetails).filter(
-        PlanExerciseDetails.id == detail_id,
-        PlanExerciseDetails.plan_id == plan_id
-    ).first()
+    plan_exercise_detail = next(
+        (detail for detail in plan.exercise_details if detail.id == detail_id), None)
     if not plan_exercise_detail:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Exercise detail not found"
         )
 
-    db.delete(plan_exercise_detail)
-    db.commit()
+    await db.delete(plan_exercise_detail)
+    await db.commit()
     return plan_exercise_detail
 
 
 @router.post("/assignments", response_model=PlanAssignmentSchema)
-def create_plan_assignment(
+async def create_plan_assignment(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     assignment_in: PlanAssignmentCreate,
-    current_user: User = Depends(check_coach_permission),
+    current_user: User = Depends(check_coach_permission_async),
 ) -> Any:
     """
     Assign a plan to an athlete.
     """
     # Verify the plan exists
-    plan = db.query(Plan).filter(Plan.id == assignment_in.plan_id).first()
+    plan = await db.get(Plan, assignment_in.plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -288,10 +342,11 @@ def create_plan_assignment(
         )
 
     # Verify the athlete exists and is assigned to the current coach
-    athlete = db.query(User).filter(
+    result = await db.execute(select(User).where(
         User.id == assignment_in.athlete_id,
         User.role == UserRole.ATHLETE
-    ).first()
+    ))
+    athlete = result.scalars().first()
     if not athlete:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -310,24 +365,23 @@ def create_plan_assignment(
         assigned_by_coach_id=current_user.id
     )
     db.add(assignment)
-    db.commit()
-    db.refresh(assignment)
+    await db.commit()
+    await db.refresh(assignment)
     return assignment
 
 
 @router.put("/assignments/{assignment_id}", response_model=PlanAssignmentSchema)
-def update_plan_assignment(
+async def update_plan_assignment(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     assignment_id: int,
     assignment_in: PlanAssignmentUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Update a plan assignment.
     """
-    assignment = db.query(PlanAssignment).filter(
-        PlanAssignment.id == assignment_id).first()
+    assignment = await db.get(PlanAssignment, assignment_id)
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -360,23 +414,22 @@ def update_plan_assignment(
             setattr(assignment, field, value)
 
     db.add(assignment)
-    db.commit()
-    db.refresh(assignment)
+    await db.commit()
+    await db.refresh(assignment)
     return assignment
 
 
 @router.delete("/assignments/{assignment_id}", response_model=PlanAssignmentSchema)
-def delete_plan_assignment(
+async def delete_plan_assignment(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     assignment_id: int,
-    current_user: User = Depends(check_coach_permission),
+    current_user: User = Depends(check_coach_permission_async),
 ) -> Any:
     """
     Delete a plan assignment.
     """
-    assignment = db.query(PlanAssignment).filter(
-        PlanAssignment.id == assignment_id).first()
+    assignment = await db.get(PlanAssignment, assignment_id)
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -390,27 +443,34 @@ def delete_plan_assignment(
             detail="Not enough permissions to delete this assignment"
         )
 
-    db.delete(assignment)
-    db.commit()
+    await db.delete(assignment)
+    await db.commit()
     return assignment
 
 
 @router.get("/assignments", response_model=List[PlanAssignmentSchema])
-def read_plan_assignments(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def read_plan_assignments(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve plan assignments.
+    Supports keyset pagination through `cursor` (see X-Next-Cursor).
     """
     if current_user.role == UserRole.ADMIN:
-        assignments = db.query(PlanAssignment).offset(skip).limit(limit).all()
+        query = select(PlanAssignment)
     elif current_user.role == UserRole.COACH:
-        assignments = db.query(PlanAssignment).filter(
-            PlanAssignment.assigned_by_coach_id == current_user.id).offset(skip).limit(limit).all()
+        query = select(PlanAssignment).where(
+            PlanAssignment.assigned_by_coach_id == current_user.id)
     else:  # ATHLETE
-        assignments = db.query(PlanAssignment).filter(
-            PlanAssignment.athlete_id == current_user.id).offset(skip).limit(limit).all()
+        query = select(PlanAssignment).where(
+            PlanAssignment.athlete_id == current_user.id)
+    result = await db.execute(keyset(query, cursor, PlanAssignment.id).offset(
+        0 if cursor else skip).limit(limit))
+    assignments = result.scalars().all()
+    set_next_cursor(response, assignments, limit, PlanAssignment.id)
     return assignments
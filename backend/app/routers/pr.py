@@ -1,21 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Any
+import json
 
-from app.core.database import get_db
-from app.routers.users import get_current_active_user
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Any, Iterator, Literal, Optional
+import datetime
+
+from app.core.database import SessionLocal, get_async_read_db
+from app.routers.users import get_current_active_user_async, check_admin_permission
 from app.models.user import User, UserRole  # Assuming UserRole enum is here
-from app.schemas.pr import PersonalRecordRead
-from app.crud import crud_pr
+from app.schemas.pr import E1RMPoint, ExerciseRepMaxCurve, PersonalRecordRead
+from app.crud import crud_e1rm, crud_pr
 
 router = APIRouter()
 
 
 @router.get("/athlete/me/personal-records", response_model=List[PersonalRecordRead])
-def read_athlete_personal_records(
+async def read_athlete_personal_records(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async)
 ) -> Any:
     """
     Retrieve all personal records for the currently authenticated athlete.
@@ -26,6 +30,77 @@ def read_athlete_personal_records(
             detail="Not authorized. Athlete role required."
         )
 
-    personal_records = crud_pr.get_prs_by_athlete(
+    personal_records = await crud_pr.get_prs_by_athlete_async(
         db=db, athlete_id=current_user.id)
     return personal_records
+
+
+@router.get("/athlete/me/rep-max-curves", response_model=List[ExerciseRepMaxCurve])
+async def read_athlete_rep_max_curves(
+    *,
+    exercise_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async)
+) -> Any:
+    """
+    Retrieve the rep-max curve (1RM..20RM) and PR timeline of each exercise
+    (or only `exercise_id`) for the currently authenticated athlete.
+    """
+    if current_user.role != UserRole.ATHLETE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized. Athlete role required."
+        )
+
+    history = await crud_pr.get_pr_history_async(
+        db=db, athlete_id=current_user.id, exercise_id=exercise_id)
+    return crud_pr.rep_max_curves(history)
+
+
+@router.get("/athlete/me/e1rm-history", response_model=List[E1RMPoint])
+async def read_athlete_e1rm_history(
+    *,
+    exercise_id: int,
+    formula: Optional[Literal["epley", "brzycki", "lombardi"]] = None,
+    since: Optional[datetime.datetime] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async)
+) -> Any:
+    """
+    Retrieve the estimated 1RM of each workout log of an exercise for the
+    currently authenticated athlete, oldest first (default formula: E1RM_FORMULA).
+    """
+    if current_user.role != UserRole.ATHLETE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized. Athlete role required."
+        )
+
+    return await crud_e1rm.get_e1rm_history_async(
+        db=db, athlete_id=current_user.id, exercise_id=exercise_id, formula=formula, since=since)
+
+
+def _rebuild_progress(batch_size: int) -> Iterator[str]:
+    # Runs after the response starts, so it cannot use a request-scoped session
+    db = SessionLocal()
+    try:
+        for progress in crud_pr.rebuild_prs(db, batch_size=batch_size):
+            yield json.dumps({"stage": "personal_records", **progress}) + "\n"
+        for progress in crud_e1rm.rebuild_best_e1rms(db, batch_size=batch_size):
+            yield json.dumps({"stage": "best_e1rms", **progress}) + "\n"
+    finally:
+        db.close()
+
+
+@router.post("/rebuild")
+def rebuild_personal_records(
+    *,
+    batch_size: int = Query(crud_pr.REBUILD_BATCH_SIZE, ge=1, le=10000),
+    current_user: User = Depends(check_admin_permission)
+) -> Any:
+    """
+    Recompute every athlete's personal records and best e1RMs from their
+    workout logs (admin only). Streams one JSON progress line (NDJSON) per
+    committed batch of athletes.
+    """
+    return StreamingResponse(_rebuild_progress(batch_size), media_type="application/x-ndjson")
@@ -1,19 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Any
+from typing import List, Any, Optional, Union
 
-from app.core.database import get_db
-from app.core.security import oauth2_scheme, verify_token, get_password_hash
+from app.core.config import settings
+from app.core.database import get_async_db, get_async_read_db, get_db
+from app.core.pagination import keyset, set_next_cursor
+from app.core.principal import (
+    UserPrincipal,
+    check_user_status,
+    check_user_status_async,
+    get_principal_by_email,
+    get_principal_by_email_async,
+    invalidate_user,
+    principal_cache,
+    status_cache,
+)
+from app.core.security import oauth2_scheme, verify_token, get_password_hash_async
 from app.models.user import User, UserRole
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
 
 router = APIRouter()
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
+def _verified_payload(token: str) -> dict:
     payload = verify_token(token)
     if not payload:
         raise HTTPException(
@@ -21,18 +32,63 @@ def get_current_user(
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = db.query(User).filter(User.email == payload["sub"]).first()
-    if not user:
+    return payload
+
+
+def _stateless_principal(payload: dict) -> Optional[UserPrincipal]:
+    """The principal built from the token claims, if stateless auth applies to them."""
+    if settings.STATELESS_AUTH and "uid" in payload:
+        return UserPrincipal.from_claims(payload)
+    return None
+
+
+def _found(value):
+    if value is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return user
+    return value
 
 
-def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> Union[User, UserPrincipal]:
+    payload = _verified_payload(token)
+
+    # Fast path: build the principal from the token claims, only consulting
+    # the DB (rate-limited) to honour deactivation, deletion, role changes and
+    # coach reassignments.
+    principal = _stateless_principal(payload)
+    if principal:
+        if settings.AUTH_REVOCATION_CHECK_SECONDS > 0:
+            _found(check_user_status(db, principal.id)).apply_to(principal)
+        return principal
+
+    return _found(get_principal_by_email(db, payload["sub"]))
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> UserPrincipal:
+    """
+    get_current_user for async endpoints: resolves the user on the event loop
+    through the async session (opened only on a cache miss) and the same caches.
+    """
+    payload = _verified_payload(token)
+
+    principal = _stateless_principal(payload)
+    if principal:
+        if settings.AUTH_REVOCATION_CHECK_SECONDS > 0:
+            _found(await check_user_status_async(db, principal.id)).apply_to(principal)
+        return principal
+
+    return _found(await get_principal_by_email_async(db, payload["sub"]))
+
+
+def _active(current_user: Union[User, UserPrincipal]) -> Union[User, UserPrincipal]:
     if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -41,8 +97,8 @@ def get_current_active_user(
     return current_user
 
 
-def check_admin_permission(current_user: User = Depends(get_current_active_user)) -> User:
-    if current_user.role != UserRole.ADMIN:
+def _with_role(current_user: Union[User, UserPrincipal], roles: List[UserRole]) -> Union[User, UserPrincipal]:
+    if current_user.role not in roles:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
@@ -50,18 +106,43 @@ def check_admin_permission(current_user: User = Depends(get_current_active_user)
     return current_user
 
 
+def get_current_active_user(
+    current_user: Union[User, UserPrincipal] = Depends(get_current_user),
+) -> Union[User, UserPrincipal]:
+    return _active(current_user)
+
+
+def check_admin_permission(current_user: User = Depends(get_current_active_user)) -> User:
+    return _with_role(current_user, [UserRole.ADMIN])
+
+
 def check_coach_permission(current_user: User = Depends(get_current_active_user)) -> User:
-    if current_user.role not in [UserRole.ADMIN, UserRole.COACH]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
-    return current_user
+    return _with_role(current_user, [UserRole.ADMIN, UserRole.COACH])
+
+
+# Async counterparts of the dependencies above, for async endpoints: they run on
+# the event loop instead of holding a threadpool worker and a sync session.
+async def get_current_active_user_async(
+    current_user: UserPrincipal = Depends(get_current_user_async),
+) -> UserPrincipal:
+    return _active(current_user)
+
+
+async def check_admin_permission_async(
+    current_user: UserPrincipal = Depends(get_current_active_user_async),
+) -> UserPrincipal:
+    return _with_role(current_user, [UserRole.ADMIN])
+
+
+async def check_coach_permission_async(
+    current_user: UserPrincipal = Depends(get_current_active_user_async),
+) -> UserPrincipal:
+    return _with_role(current_user, [UserRole.ADMIN, UserRole.COACH])
 
 
 @router.get("/me", response_model=UserSchema)
-def read_users_me(
-    current_user: User = Depends(get_current_active_user),
+async def read_users_me(
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Get current user.
@@ -69,40 +150,60 @@ def read_users_me(
     return current_user
 
 
+@router.get("/auth-cache/stats", response_model=dict)
+async def read_auth_cache_stats(
+    current_user: User = Depends(check_admin_permission_async),
+) -> Any:
+    """
+    Hit/miss counters of the in-process authenticated user caches.
+    """
+    return {
+        "principals": principal_cache.stats(),
+        "user_status": status_cache.stats(),
+    }
+
+
 @router.get("/", response_model=List[UserSchema])
-def read_users(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def read_users(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve users.
+    Supports keyset pagination through `cursor` (see X-Next-Cursor).
     """
     if current_user.role == UserRole.ADMIN:
-        users = db.query(User).offset(skip).limit(limit).all()
+        query = select(User)
     elif current_user.role == UserRole.COACH:
-        users = db.query(User).filter(
-            User.coach_id == current_user.id).offset(skip).limit(limit).all()
+        query = select(User).where(User.coach_id == current_user.id)
     else:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
+    result = await db.execute(keyset(query, cursor, User.id).offset(
+        0 if cursor else skip).limit(limit))
+    users = result.scalars().all()
+    set_next_cursor(response, users, limit, User.id)
     return users
 
 
 @router.post("/", response_model=UserSchema)
-def create_user(
+async def create_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserCreate,
-    current_user: User = Depends(check_admin_permission),
+    current_user: User = Depends(check_admin_permission_async),
 ) -> Any:
     """
     Create new user.
     """
-    user = db.query(User).filter(User.email == user_in.email).first()
+    result = await db.execute(select(User).where(User.email == user_in.email))
+    user = result.scalars().first()
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -111,10 +212,11 @@ def create_user(
 
     # Validate coach_id if provided
     if user_in.coach_id:
-        coach = db.query(User).filter(
+        result = await db.execute(select(User).where(
             User.id == user_in.coach_id,
             User.role == UserRole.COACH
-        ).first()
+        ))
+        coach = result.scalars().first()
         if not coach:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -123,28 +225,28 @@ def create_user(
 
     user = User(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await get_password_hash_async(user_in.password),
         role=user_in.role,
         coach_id=user_in.coach_id
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.put("/{user_id}", response_model=UserSchema)
-def update_user(
+async def update_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: int,
     user_in: UserUpdate,
-    current_user: User = Depends(check_admin_permission),
+    current_user: User = Depends(check_admin_permission_async),
 ) -> Any:
     """
     Update a user.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -153,50 +255,55 @@ def update_user(
 
     # Validate coach_id if provided
     if user_in.coach_id:
-        coach = db.query(User).filter(
+        result = await db.execute(select(User).where(
             User.id == user_in.coach_id,
             User.role == UserRole.COACH
-        ).first()
+        ))
+        coach = result.scalars().first()
         if not coach:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid coach_id"
             )
 
+    previous_email = user.email
     for field, value in user_in.dict(exclude_unset=True).items():
         setattr(user, field, value)
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_user(user_id=user.id, email=previous_email)
+    invalidate_user(email=user.email)
     return user
 
 
 @router.delete("/{user_id}", response_model=UserSchema)
-def delete_user(
+async def delete_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: int,
-    current_user: User = Depends(check_admin_permission),
+    current_user: User = Depends(check_admin_permission_async),
 ) -> Any:
     """
     Delete a user.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    invalidate_user(user_id=user_id, email=user.email)
     return user
 
 
 @router.get("/me/athletes", response_model=List[UserSchema])
-def read_coach_athletes(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def read_coach_athletes(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Get all athletes assigned to the current coach.
@@ -207,9 +314,10 @@ def read_coach_athletes(
             detail="Only coaches can view their athletes"
         )
 
-    athletes = db.query(User).filter(
+    result = await db.execute(select(User).where(
         User.coach_id == current_user.id,
         User.role == UserRole.ATHLETE
-    ).all()
+    ))
+    athletes = result.scalars().all()
 
     return athletes
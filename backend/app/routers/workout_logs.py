@@ -1,142 +1,425 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Any
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import exists, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db, get_async_read_db
+from app.core.pagination import keyset, set_next_cursor
 from app.core.security import oauth2_scheme, verify_token
+from app.core.units import weights_to_kg
 from app.models.user import User, UserRole
+from app.models.pr import PersonalRecord
 from app.models.workout_log import WorkoutLog
 from app.models.plan import PlanAssignment, PlanExerciseDetails # Added PlanExerciseDetails
-from app.schemas.workout_log import WorkoutLog as WorkoutLogSchema, WorkoutLogCreate, WorkoutLogUpdate, WorkoutLogWithPRStatus # Added WorkoutLogWithPRStatus
-from app.routers.users import get_current_active_user, check_admin_permission, check_coach_permission
-from app.crud import crud_pr # Added crud_pr
+from app.schemas.workout_log import (
+    WorkoutLog as WorkoutLogSchema, WorkoutLogCreate, WorkoutLogUpdate, WorkoutLogWithPRStatus, # Added WorkoutLogWithPRStatus
+    WorkoutSessionCreate, WorkoutLogSyncItem, WorkoutLogSyncResult, TrainingVolume
+)
+from app.routers.users import get_current_active_user_async
+from app.crud import crud_e1rm, crud_pr, crud_workout_sets # Added crud_pr
 
 router = APIRouter()
 
+# Upper bound on logs accepted by POST /workout-logs/batch
+MAX_WORKOUT_LOG_BATCH_SIZE = 50
+# Upper bound on queued logs accepted by POST /workout-logs/sync
+MAX_WORKOUT_LOG_SYNC_SIZE = 200
+# Updating any of these can change the athlete's PRs
+PR_FIELDS = {"sets_performed", "reps_performed_per_set", "weight_used_per_set"}
+
+
+async def _logs_by_idempotency_key(
+    db: AsyncSession, athlete_id: int, keys: Iterable[str]
+) -> Dict[str, Tuple[WorkoutLog, bool]]:
+    """
+    Already stored logs for the given client keys, with whether each still
+    holds a PR, in one lookup on uq_workout_logs_athlete_id_idempotency_key.
+    """
+    holds_pr = exists().where(
+        PersonalRecord.athlete_id == WorkoutLog.athlete_id,
+        PersonalRecord.workout_log_id == WorkoutLog.id
+    )
+    result = await db.execute(select(WorkoutLog, holds_pr).where(
+        WorkoutLog.athlete_id == athlete_id,
+        WorkoutLog.idempotency_key.in_(list(keys))
+    ))
+    return {workout_log.idempotency_key: (workout_log, has_pr) for workout_log, has_pr in result}
+
+
+def _record_logged(
+    db: Session, athlete_id: int, logged: List[Tuple[WorkoutLog, int]]
+) -> List[PersonalRecord]:
+    """
+    Writes the sets of new (log, exercise_id) pairs and raises the athlete's
+    PRs and best e1RMs they beat. Sync crud, run through AsyncSession.run_sync.
+    """
+    crud_workout_sets.write_sets(db, logged)
+    new_prs = crud_pr.upsert_prs_batch(
+        db,
+        athlete_id=athlete_id,
+        lifts=crud_pr.best_lifts_for_logs(logged)
+    )
+    crud_e1rm.upsert_best_e1rms(
+        db, athlete_id=athlete_id, bests=crud_e1rm.best_e1rms_for_logs(logged))
+    return new_prs
+
+
+def _recompute_for_update(db: Session, workout_log: WorkoutLog, exercise_id: int) -> None:
+    # PRs this log held may drop to another log; PRs it now beats are raised
+    crud_pr.recompute_prs_for_log(db, workout_log)
+    crud_pr.upsert_prs_batch(
+        db,
+        athlete_id=workout_log.athlete_id,
+        lifts=crud_pr.best_lifts_for_logs([(workout_log, exercise_id)])
+    )
+    crud_e1rm.recompute_best_e1rm(
+        db, athlete_id=workout_log.athlete_id, exercise_id=exercise_id)
+
+
+def _recompute_for_delete(db: Session, workout_log: WorkoutLog) -> None:
+    crud_pr.recompute_prs_for_log(db, workout_log, deleting=True)
+    if workout_log.plan_exercise_details:
+        crud_e1rm.recompute_best_e1rm(
+            db, athlete_id=workout_log.athlete_id,
+            exercise_id=workout_log.plan_exercise_details.exercise_id,
+            exclude_log_id=workout_log.id)
+
+
+async def _workout_log_with_details(db: AsyncSession, workout_log_id: int) -> Optional[WorkoutLog]:
+    result = await db.execute(select(WorkoutLog).options(
+        selectinload(WorkoutLog.plan_exercise_details)).where(WorkoutLog.id == workout_log_id))
+    return result.scalars().first()
+
+
+def _with_pr_status(workout_log: WorkoutLog, new_pr_achieved: bool) -> WorkoutLogWithPRStatus:
+    return WorkoutLogWithPRStatus(
+        **WorkoutLogSchema.model_validate(workout_log).model_dump(),
+        new_pr_achieved=new_pr_achieved
+    )
+
 
 @router.get("/", response_model=List[WorkoutLogSchema])
-def read_workout_logs(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def read_workout_logs(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     plan_assignment_id: int = None,
     start_date: datetime = None,
     end_date: datetime = None,
 ) -> Any:
     """
-    Retrieve workout logs.
+    Retrieve workout logs, newest first.
+    Pass the X-Next-Cursor response header back as `cursor` to page through
+    long histories at constant cost; `skip` is ignored when a cursor is given.
     """
-    query = db.query(WorkoutLog)
+    query = select(WorkoutLog)
 
     if current_user.role == UserRole.ADMIN:
         pass  # Admin can see all logs
     elif current_user.role == UserRole.COACH:
-        # Coach can only see logs of their athletes (using direct query)
-        managed_athletes = db.query(User).filter(
-            User.coach_id == current_user.id).all()
-        athlete_ids = [athlete.id for athlete in managed_athletes]
-        query = query.filter(WorkoutLog.athlete_id.in_(athlete_ids))
+        # Coach can only see logs of their athletes
+        managed_athlete_ids = select(User.id).where(
+            User.coach_id == current_user.id)
+        query = query.where(WorkoutLog.athlete_id.in_(managed_athlete_ids))
     else:  # ATHLETE
         # Athletes can only see their own logs
-        query = query.filter(WorkoutLog.athlete_id == current_user.id)
+        query = query.where(WorkoutLog.athlete_id == current_user.id)
 
     # Apply filters
     if plan_assignment_id:
-        query = query.filter(
+        query = query.where(
             WorkoutLog.plan_assignment_id == plan_assignment_id)
     if start_date:
-        query = query.filter(WorkoutLog.date_performed >= start_date)
+        query = query.where(WorkoutLog.date_performed >= start_date)
     if end_date:
-        query = query.filter(WorkoutLog.date_performed <= end_date)
+        query = query.where(WorkoutLog.date_performed <= end_date)
 
-    workout_logs = query.order_by(
-        WorkoutLog.date_performed.desc()).offset(skip).limit(limit).all()
+    query = keyset(query, cursor, WorkoutLog.date_performed, WorkoutLog.id, descending=True)
+    result = await db.execute(query.offset(0 if cursor else skip).limit(limit))
+    workout_logs = result.scalars().all()
+    set_next_cursor(response, workout_logs, limit, WorkoutLog.date_performed, WorkoutLog.id)
     return workout_logs
 
 
 @router.post("/", response_model=WorkoutLogWithPRStatus) # Changed response_model
-def create_workout_log(
+async def create_workout_log(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     workout_log_in: WorkoutLogCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Create new workout log.
+    With an idempotency_key, retries return the log created by the first
+    request instead of creating a duplicate.
     """
+    key = workout_log_in.idempotency_key
+    if key:
+        existing = (await _logs_by_idempotency_key(db, current_user.id, [key])).get(key)
+        if existing:
+            return _with_pr_status(*existing)
+
     # Verify the plan assignment exists and is active
-    assignment = db.query(PlanAssignment).filter(
+    result = await db.execute(select(PlanAssignment).where(
         PlanAssignment.id == workout_log_in.plan_assignment_id,
         PlanAssignment.athlete_id == current_user.id
-    ).first()
+    ))
+    assignment = result.scalars().first()
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Plan assignment not found"
         )
 
+    # Fetch the PlanExerciseDetails to get the exercise_id
+    plan_exercise_detail = await db.get(PlanExerciseDetails, workout_log_in.plan_exercise_details_id)
+
     workout_log = WorkoutLog(
         **workout_log_in.dict(),
         athlete_id=current_user.id
     )
     db.add(workout_log)
-    db.commit()
-    db.refresh(workout_log)
+    try:
+        await db.flush()
+    except IntegrityError:
+        # A concurrent retry with the same key won the insert
+        await db.rollback()
+        existing = (await _logs_by_idempotency_key(db, current_user.id, [key])).get(key) if key else None
+        if not existing:
+            raise
+        return _with_pr_status(*existing)
 
-    any_new_pr_achieved = False
+    new_prs = []
+    # Logs whose exercise details are missing are not considered for PRs
+    if plan_exercise_detail:
+        new_prs = await db.run_sync(
+            _record_logged, workout_log.athlete_id,
+            [(workout_log, plan_exercise_detail.exercise_id)])
 
-    # Fetch the PlanExerciseDetails to get the exercise_id
-    plan_exercise_detail = db.query(PlanExerciseDetails).filter(PlanExerciseDetails.id == workout_log.plan_exercise_details_id).first()
-
-    if not plan_exercise_detail:
-        # This case should ideally not happen if data integrity is maintained
-        # but handle it defensively.
-        return WorkoutLogWithPRStatus.from_orm(workout_log, {"new_pr_achieved": False})
-
-    exercise_id = plan_exercise_detail.exercise_id
-
-    # Iterate through each set performed in the workout log
-    num_sets = workout_log.sets_performed
-    if len(workout_log.reps_performed_per_set) == num_sets and len(workout_log.weight_used_per_set) == num_sets:
-        for i in range(num_sets):
-            reps = workout_log.reps_performed_per_set[i]
-            try:
-                weight = float(workout_log.weight_used_per_set[i]) # Ensure weight is float
-            except ValueError:
-                # Handle cases where weight might not be a valid float, skip PR for this set
-                continue
-
-            if reps > 0 and weight > 0: # Only consider valid sets for PRs
-                _, pr_achieved_for_set = crud_pr.find_or_create_pr_for_log(
-                    db=db,
-                    athlete_id=workout_log.athlete_id,
-                    exercise_id=exercise_id,
-                    reps_achieved=reps,
-                    weight_lifted=weight,
-                    date_achieved=workout_log.date_performed.date(), # Extract date part
-                    workout_log_id=workout_log.id
-                )
-                if pr_achieved_for_set:
-                    any_new_pr_achieved = True
-
-    return WorkoutLogWithPRStatus.from_orm(workout_log, {"new_pr_achieved": any_new_pr_achieved})
+    # The log and its PRs are committed together
+    created_log = _with_pr_status(workout_log, bool(new_prs))
+    await db.commit()
+    return created_log
+
+
+@router.post("/batch", response_model=List[WorkoutLogWithPRStatus])
+async def create_workout_logs_batch(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    session_in: WorkoutSessionCreate,
+    current_user: User = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Create the workout logs of a whole session at once.
+    All logs are created or none is; PR detection runs once for the session
+    and a log is flagged when it holds one of the PRs the session set.
+    """
+    if len(session_in.logs) > MAX_WORKOUT_LOG_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_WORKOUT_LOG_BATCH_SIZE} workout logs can be created per request"
+        )
+
+    result = await db.execute(select(PlanAssignment).where(
+        PlanAssignment.id == session_in.plan_assignment_id,
+        PlanAssignment.athlete_id == current_user.id
+    ))
+    assignment = result.scalars().first()
+    if not assignment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Plan assignment not found"
+        )
+
+    # All exercise details of the session must belong to the assigned plan
+    details_ids = {log_in.plan_exercise_details_id for log_in in session_in.logs}
+    result = await db.execute(select(PlanExerciseDetails.id, PlanExerciseDetails.exercise_id).where(
+        PlanExerciseDetails.id.in_(details_ids),
+        PlanExerciseDetails.plan_id == assignment.plan_id
+    ))
+    exercise_ids = dict(result.all())
+    unknown_ids = details_ids - exercise_ids.keys()
+    if unknown_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Plan exercise details not in the assigned plan: {sorted(unknown_ids)}"
+        )
+
+    workout_logs = [
+        WorkoutLog(
+            **log_in.dict(),
+            plan_assignment_id=assignment.id,
+            athlete_id=current_user.id
+        )
+        for log_in in session_in.logs
+    ]
+    db.add_all(workout_logs)
+    await db.flush()
+
+    logged = [(workout_log, exercise_ids[workout_log.plan_exercise_details_id])
+              for workout_log in workout_logs]
+    new_prs = await db.run_sync(_record_logged, current_user.id, logged)
+    pr_log_ids = {pr.workout_log_id for pr in new_prs}
+
+    created_logs = [_with_pr_status(workout_log, workout_log.id in pr_log_ids)
+                    for workout_log in workout_logs]
+    await db.commit()
+    return created_logs
+
+
+@router.post("/sync", response_model=List[WorkoutLogSyncResult])
+async def sync_workout_logs(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    queue: List[WorkoutLogSyncItem],
+    current_user: User = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Upload a client's offline queue of workout logs.
+    Logs are deduplicated by idempotency_key against everything already
+    uploaded in one query, so resending the queue is cheap and safe. Each
+    item gets the canonical log id and a status: created, duplicate (already
+    uploaded) or rejected (unknown assignment or exercise; retrying will not
+    help, drop it from the queue). Logs are dated with their performed_at, the
+    time of the workout, rather than the time of the sync.
+    """
+    if len(queue) > MAX_WORKOUT_LOG_SYNC_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_WORKOUT_LOG_SYNC_SIZE} workout logs can be synced per request"
+        )
+
+    # A key repeated within the queue refers to its first occurrence
+    items: Dict[str, WorkoutLogSyncItem] = {}
+    for item in queue:
+        items.setdefault(item.idempotency_key, item)
+
+    results: Dict[str, WorkoutLogSyncResult] = {}
+
+    def mark_duplicates(stored: Dict[str, Tuple[WorkoutLog, bool]]) -> None:
+        for key, (workout_log, holds_pr) in stored.items():
+            results[key] = WorkoutLogSyncResult(
+                idempotency_key=key, id=workout_log.id, status="duplicate",
+                new_pr_achieved=holds_pr)
+
+    mark_duplicates(await _logs_by_idempotency_key(db, current_user.id, items))
+    pending = [item for key, item in items.items() if key not in results]
+
+    if pending:
+        # Valid (assignment, exercise details) pairs of this athlete, in one query
+        exercise_ids = {
+            (assignment_id, details_id): exercise_id
+            for assignment_id, details_id, exercise_id in await db.execute(select(
+                PlanAssignment.id, PlanExerciseDetails.id, PlanExerciseDetails.exercise_id
+            ).join(
+                PlanExerciseDetails, PlanExerciseDetails.plan_id == PlanAssignment.plan_id
+            ).where(
+                PlanAssignment.athlete_id == current_user.id,
+                PlanAssignment.id.in_({item.plan_assignment_id for item in pending}),
+                PlanExerciseDetails.id.in_({item.plan_exercise_details_id for item in pending})
+            ))
+        }
+        accepted = []
+        for item in pending:
+            if (item.plan_assignment_id, item.plan_exercise_details_id) in exercise_ids:
+                accepted.append(item)
+            else:
+                results[item.idempotency_key] = WorkoutLogSyncResult(
+                    idempotency_key=item.idempotency_key, status="rejected",
+                    detail="Plan assignment or exercise details not found")
+
+        if accepted:
+            now = datetime.utcnow()
+            # Keys sorted so concurrent syncs take the index locks in the same
+            # order; keys inserted by one meanwhile are skipped, not an error.
+            created_logs = (await db.scalars(
+                insert(WorkoutLog).on_conflict_do_nothing(
+                    index_elements=[WorkoutLog.athlete_id, WorkoutLog.idempotency_key]
+                ).returning(WorkoutLog),
+                [dict(item.dict(exclude={"performed_at"}), athlete_id=current_user.id,
+                      date_performed=item.performed_at or now,
+                      weight_kg_per_set=weights_to_kg(item.weight_used_per_set))
+                 for item in sorted(accepted, key=lambda item: item.idempotency_key)]
+            )).all()
+
+            logged = [(workout_log, exercise_ids[(workout_log.plan_assignment_id,
+                                                  workout_log.plan_exercise_details_id)])
+                      for workout_log in created_logs]
+            new_prs = await db.run_sync(_record_logged, current_user.id, logged)
+            pr_log_ids = {pr.workout_log_id for pr in new_prs}
+            for workout_log in created_logs:
+                results[workout_log.idempotency_key] = WorkoutLogSyncResult(
+                    idempotency_key=workout_log.idempotency_key, id=workout_log.id,
+                    status="created", new_pr_achieved=workout_log.id in pr_log_ids)
+
+            raced_keys = [item.idempotency_key for item in accepted
+                          if item.idempotency_key not in results]
+            if raced_keys:
+                mark_duplicates(await _logs_by_idempotency_key(db, current_user.id, raced_keys))
+
+    await db.commit()
+    return [results[item.idempotency_key] for item in queue]
+
+
+@router.get("/volume", response_model=List[TrainingVolume])
+async def read_training_volume(
+    *,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async),
+    athlete_id: Optional[int] = None,
+    start_date: datetime = None,
+    end_date: datetime = None,
+) -> Any:
+    """
+    Training volume per exercise (sets, reps, kg lifted), aggregated in SQL
+    over the workout_sets table. Coaches pass the athlete_id of one of their
+    athletes; athletes get their own.
+    """
+    if not settings.WORKOUT_SETS_DUAL_WRITE:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Set-level data is not enabled"
+        )
+
+    if current_user.role == UserRole.ATHLETE or athlete_id is None:
+        athlete_id = current_user.id
+    elif current_user.role == UserRole.COACH:
+        athlete = await db.scalar(select(User.id).where(
+            User.id == athlete_id, User.coach_id == current_user.id))
+        if not athlete:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Athlete not found"
+            )
+
+    return [
+        TrainingVolume(exercise_id=exercise_id, sets=sets, reps=reps, volume_kg=volume_kg)
+        for exercise_id, sets, reps, volume_kg in await db.run_sync(
+            crud_workout_sets.training_volume, athlete_id=athlete_id, start=start_date, end=end_date)
+    ]
 
 
 @router.put("/{workout_log_id}", response_model=WorkoutLogSchema)
-def update_workout_log(
+async def update_workout_log(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     workout_log_id: int,
     workout_log_in: WorkoutLogUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Update a workout log.
+    Correcting sets, reps or weights also corrects the athlete's PRs and best e1RM.
     """
-    workout_log = db.query(WorkoutLog).filter(
-        WorkoutLog.id == workout_log_id).first()
+    workout_log = await _workout_log_with_details(db, workout_log_id)
     if not workout_log:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -150,27 +433,41 @@ def update_workout_log(
             detail="Not enough permissions to update this workout log"
         )
 
-    for field, value in workout_log_in.dict(exclude_unset=True).items():
+    update_data = workout_log_in.dict(exclude_unset=True)
+    for field, value in update_data.items():
         setattr(workout_log, field, value)
 
+    per_set = [workout_log.reps_performed_per_set, workout_log.weight_used_per_set,
+               workout_log.rest_taken_per_set]
+    if any(values is not None and len(values) != workout_log.sets_performed for values in per_set):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Per-set values must have one entry per set (sets_performed)"
+        )
+
     db.add(workout_log)
-    db.commit()
-    db.refresh(workout_log)
+    await db.run_sync(crud_workout_sets.replace_sets, workout_log)
+    if update_data.keys() & PR_FIELDS:
+        await db.flush()
+        await db.run_sync(
+            _recompute_for_update, workout_log, workout_log.plan_exercise_details.exercise_id)
+    await db.commit()
+    await db.refresh(workout_log)
     return workout_log
 
 
 @router.delete("/{workout_log_id}", response_model=WorkoutLogSchema)
-def delete_workout_log(
+async def delete_workout_log(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     workout_log_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Delete a workout log.
+    PRs and the best e1RM set by it fall back to the next best remaining log, or are removed.
     """
-    workout_log = db.query(WorkoutLog).filter(
-        WorkoutLog.id == workout_log_id).first()
+    workout_log = await _workout_log_with_details(db, workout_log_id)
     if not workout_log:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -184,6 +481,7 @@ def delete_workout_log(
             detail="Not enough permissions to delete this workout log"
         )
 
-    db.delete(workout_log)
-    db.commit()
+    await db.run_sync(_recompute_for_delete, workout_log)
+    await db.delete(workout_log)
+    await db.commit()
     return workout_log
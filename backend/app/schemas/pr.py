@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 import datetime
 
 # Import Exercise for nesting in PersonalRecordRead
@@ -27,6 +27,37 @@ class PersonalRecordRead(PersonalRecordBase):
     id: int
     athlete_id: int
     exercise: Exercise # Nested exercise information, using Exercise schema
+    best_e1rm: Optional[float] = None # Best estimated 1RM for the exercise
 
     class Config:
         orm_mode = True
+
+class RepMax(BaseModel):
+    reps: int
+    weight: float
+    date_achieved: datetime.date
+    workout_log_id: Optional[int] = None
+
+    class Config:
+        orm_mode = True
+
+class PersonalRecordHistoryRead(BaseModel):
+    reps: int
+    weight: Optional[float] = None # None: record removed, no logged lift left
+    date_achieved: Optional[datetime.date] = None
+    workout_log_id: Optional[int] = None
+    recorded_at: datetime.datetime
+
+    class Config:
+        orm_mode = True
+
+class ExerciseRepMaxCurve(BaseModel):
+    exercise_id: int
+    best_e1rm: Optional[float] = None
+    curve: List[RepMax] # Current best weight per rep count (1RM..20RM)
+    timeline: List[PersonalRecordHistoryRead] # Every PR change, oldest first
+
+class E1RMPoint(BaseModel):
+    workout_log_id: int
+    date_performed: datetime.datetime
+    e1rm: float # Best estimated 1RM of the log's sets
@@ -1,6 +1,34 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+from app.core.units import parse_weight_kg
+
+# Tolerated difference between a client's clock and ours for performed_at
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+
+def _check_weights(weights: Optional[List[str]]) -> Optional[List[str]]:
+    for weight in weights or []:
+        parse_weight_kg(weight)  # ValueError becomes a 422
+    return weights
+
+
+class PerSetValidation(BaseModel):
+    """Input checks for logs: numeric weights and one entry per set in every per-set list."""
+
+    @field_validator("weight_used_per_set", check_fields=False)
+    @classmethod
+    def weights_are_numeric(cls, weights: List[str]) -> List[str]:
+        return _check_weights(weights)
+
+    @model_validator(mode="after")
+    def sets_line_up(self):
+        per_set = [self.reps_performed_per_set, self.weight_used_per_set, self.rest_taken_per_set]
+        if any(values is not None and len(values) != self.sets_performed for values in per_set):
+            raise ValueError("reps_performed_per_set, weight_used_per_set and rest_taken_per_set "
+                             "must have one entry per set (sets_performed)")
+        return self
 
 
 class WorkoutLogBase(BaseModel):
@@ -12,12 +40,49 @@ class WorkoutLogBase(BaseModel):
     rest_taken_per_set: Optional[List[int]] = None
     athlete_notes: Optional[str] = None
     duration_seconds: Optional[int] = None
+    # Client-generated (e.g. a UUID); resubmitting it returns the same log
+    idempotency_key: Optional[str] = Field(None, max_length=64)
 
 
-class WorkoutLogCreate(WorkoutLogBase):
+class WorkoutLogCreate(PerSetValidation, WorkoutLogBase):
     pass
 
 
+class WorkoutLogSyncItem(WorkoutLogCreate):
+    """A log from a client's offline queue; the key is required here."""
+    idempotency_key: str = Field(..., min_length=1, max_length=64)
+    # When the workout was done (stored as date_performed); defaults to the sync time
+    performed_at: Optional[datetime] = None
+
+    @field_validator("performed_at")
+    @classmethod
+    def performed_in_the_past(cls, performed_at: Optional[datetime]) -> Optional[datetime]:
+        if performed_at is None:
+            return None
+        # Stored as naive UTC, like date_performed; naive input is taken as UTC
+        if performed_at.tzinfo is not None:
+            performed_at = performed_at.astimezone(timezone.utc).replace(tzinfo=None)
+        if performed_at > datetime.utcnow() + MAX_CLOCK_SKEW:
+            raise ValueError("performed_at must not be in the future")
+        return performed_at
+
+
+class WorkoutSessionLog(PerSetValidation):
+    """One exercise of a session; the assignment is given once per session."""
+    plan_exercise_details_id: int
+    sets_performed: int
+    reps_performed_per_set: List[int]
+    weight_used_per_set: List[str]
+    rest_taken_per_set: Optional[List[int]] = None
+    athlete_notes: Optional[str] = None
+    duration_seconds: Optional[int] = None
+
+
+class WorkoutSessionCreate(BaseModel):
+    plan_assignment_id: int
+    logs: List[WorkoutSessionLog]
+
+
 class WorkoutLogUpdate(BaseModel):
     sets_performed: Optional[int] = None
     reps_performed_per_set: Optional[List[int]] = None
@@ -26,11 +91,26 @@ class WorkoutLogUpdate(BaseModel):
     athlete_notes: Optional[str] = None
     duration_seconds: Optional[int] = None
 
+    @field_validator("sets_performed", "reps_performed_per_set", "weight_used_per_set")
+    @classmethod
+    def not_null(cls, value):
+        # May be omitted, but the columns are NOT NULL
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
+    @field_validator("weight_used_per_set")
+    @classmethod
+    def weights_are_numeric(cls, weights: Optional[List[str]]) -> Optional[List[str]]:
+        return _check_weights(weights)
+
 
 class WorkoutLogInDB(WorkoutLogBase):
     id: int
     athlete_id: int
     date_performed: datetime
+    # weight_used_per_set parsed to kg; None for legacy entries that are not numbers
+    weight_kg_per_set: Optional[List[Optional[float]]] = None
 
     class Config:
         from_attributes = True
@@ -51,3 +131,20 @@ class WorkoutLogRead(WorkoutLogInDB):
 # Schema for returning workout log along with PR status
 class WorkoutLogWithPRStatus(WorkoutLog):
     new_pr_achieved: bool
+
+
+# Outcome of one queued log in POST /workout-logs/sync
+class WorkoutLogSyncResult(BaseModel):
+    idempotency_key: str
+    id: Optional[int] = None  # canonical log id, unless rejected
+    status: str  # created, duplicate, rejected
+    new_pr_achieved: bool = False
+    detail: Optional[str] = None
+
+
+# Per-exercise totals of GET /workout-logs/volume
+class TrainingVolume(BaseModel):
+    exercise_id: int
+    sets: int
+    reps: int
+    volume_kg: float
@@ -0,0 +1,36 @@
+"""
+Backfill of the workout_sets table from the workout logs' per-set arrays.
+
+Usage (from the backend directory, after enabling WORKOUT_SETS_DUAL_WRITE so
+new logs are mirrored while it runs):
+    python -m scripts.backfill_workout_sets [--batch-size 5000]
+
+Only logs without workout_sets rows are filled, so it can be re-run or
+resumed after an interruption.
+"""
+import argparse
+
+import app.db.base  # noqa: F401  (registers all models)
+from app.core.database import SessionLocal
+from app.crud.crud_workout_sets import BACKFILL_BATCH_SIZE, backfill_workout_sets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE,
+                        help="workout log ids per committed batch")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    total = 0
+    try:
+        for done, max_id, inserted in backfill_workout_sets(db, batch_size=args.batch_size):
+            total += inserted
+            print(f"logs up to id {done}/{max_id}: {inserted} sets inserted")
+    finally:
+        db.close()
+    print(f"Backfill complete: {total} sets inserted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+One-shot bootstrap: create the superuser if it does not exist yet and apply
+NUTRITION_TOTALS_ENGINE to the nutrition totals triggers.
+
+Usage (from the backend directory, after `alembic upgrade head`):
+    python -m scripts.bootstrap
+
+Run it once per deploy instead of on every worker start.
+"""
+import app.db.base  # noqa: F401  (registers all models)
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.init_db import init_db
+from app.crud.crud_nutrition import sync_totals_engine
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        init_db(db)
+        if sync_totals_engine(db):
+            print(f"Nutrition totals now maintained by: {settings.NUTRITION_TOTALS_ENGINE}")
+    finally:
+        db.close()
+    print("Bootstrap complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Pick the bcrypt cost that fits a target verify latency on this hardware.
+
+Usage (from the backend directory):
+    python -m scripts.calibrate_bcrypt --target-ms 250
+
+Times a password verification for each cost in the range and prints the
+highest one whose median latency stays within the target. Set the result
+as BCRYPT_ROUNDS; existing hashes are migrated on the next login.
+"""
+import argparse
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+
+def median_verify_ms(rounds: int, samples: int) -> float:
+    hashed = bcrypt.using(rounds=rounds).hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.verify("calibration-password", hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    chosen = None
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        latency = median_verify_ms(rounds, args.samples)
+        print(f"rounds={rounds:2d}  median verify {latency:8.1f} ms")
+        if latency > args.target_ms:
+            break
+        chosen = rounds
+
+    if chosen is None:
+        print(f"Even {args.min_rounds} rounds exceed {args.target_ms:.0f} ms; "
+              f"use BCRYPT_ROUNDS={args.min_rounds} or lower the minimum.")
+    else:
+        print(f"BCRYPT_ROUNDS={chosen}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+EXPLAIN-based regression check for the hot query paths.
+
+Usage (from the backend directory, against a migrated database):
+    python -m scripts.check_query_plans
+
+Runs EXPLAIN on the queries behind the main list endpoints and exits with
+status 1 if any of them no longer uses its designed index. Sequential scans
+are disabled for the check so the result does not depend on table sizes.
+"""
+import datetime
+import json
+import sys
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import desc, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection
+
+import app.db.base  # noqa: F401  (registers all models)
+from app.core.database import engine
+from app.models.nutrition_plan import NutritionPlanAssignment
+from app.models.plan import PlanAssignment
+from app.models.pr import PersonalRecord, PersonalRecordHistory
+from app.models.user import User
+from app.models.workout_log import WorkoutLog
+from app.models.workout_set import WorkoutSet
+
+_since = datetime.datetime(2024, 1, 1)
+
+# (description, statement, index that must appear in the plan)
+HOT_QUERIES: List[Tuple[str, object, str]] = [
+    (
+        "read_workout_logs: athlete history by date range",
+        select(WorkoutLog)
+        .where(WorkoutLog.athlete_id == 1, WorkoutLog.date_performed >= _since)
+        .order_by(WorkoutLog.date_performed.desc()).limit(100),
+        "ix_workout_logs_athlete_id_date_performed",
+    ),
+    (
+        "read_workout_logs: by plan assignment",
+        select(WorkoutLog).where(WorkoutLog.plan_assignment_id == 1),
+        "ix_workout_logs_plan_assignment_id",
+    ),
+    (
+        "read_plan_assignments: athlete",
+        select(PlanAssignment).where(PlanAssignment.athlete_id == 1),
+        "ix_plan_assignments_athlete_id",
+    ),
+    (
+        "read_plan_assignments: coach",
+        select(PlanAssignment).where(PlanAssignment.assigned_by_coach_id == 1),
+        "ix_plan_assignments_assigned_by_coach_id",
+    ),
+    (
+        "read_nutrition_plan_assignments: athlete",
+        select(NutritionPlanAssignment).where(NutritionPlanAssignment.athlete_id == 1),
+        "ix_nutrition_plan_assignments_athlete_id",
+    ),
+    (
+        "read_users / read_coach_athletes: coach's athletes",
+        select(User).where(User.coach_id == 1),
+        "ix_users_coach_id",
+    ),
+    (
+        "read_athlete_personal_records",
+        select(PersonalRecord).where(PersonalRecord.athlete_id == 1)
+        .order_by(desc(PersonalRecord.date_achieved), PersonalRecord.id).limit(100),
+        "ix_personal_records_athlete_id_date_achieved",
+    ),
+    (
+        "read_athlete_rep_max_curves",
+        select(PersonalRecordHistory)
+        .where(PersonalRecordHistory.athlete_id == 1, PersonalRecordHistory.reps.between(1, 20))
+        .order_by(PersonalRecordHistory.exercise_id, PersonalRecordHistory.reps, PersonalRecordHistory.id),
+        "ix_personal_record_history_athlete_id_exercise_id_reps",
+    ),
+    (
+        "recompute_prs_for_log (workout_sets): best set per rep count",
+        select(WorkoutSet)
+        .distinct(WorkoutSet.athlete_id, WorkoutSet.exercise_id, WorkoutSet.reps)
+        .where(WorkoutSet.athlete_id == 1, WorkoutSet.exercise_id == 1, WorkoutSet.reps.in_([1, 5]))
+        .order_by(WorkoutSet.athlete_id, WorkoutSet.exercise_id, WorkoutSet.reps,
+                  WorkoutSet.weight_kg.desc(), WorkoutSet.performed_at, WorkoutSet.workout_log_id),
+        "ix_workout_sets_athlete_id_exercise_id_reps",
+    ),
+    (
+        # The rows it aggregates: on small tables the planner may group through
+        # the (athlete_id, exercise_id, reps) index instead, whatever the range
+        "read_training_volume: athlete sets by date range",
+        select(WorkoutSet.exercise_id, WorkoutSet.reps, WorkoutSet.weight_kg)
+        .where(WorkoutSet.athlete_id == 1, WorkoutSet.performed_at >= _since),
+        "ix_workout_sets_athlete_id_performed_at",
+    ),
+]
+
+
+def _index_names(plan: dict) -> Iterator[str]:
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from _index_names(child)
+
+
+def check_plans(connection: Connection) -> List[Tuple[str, str, List[str]]]:
+    """
+    EXPLAINs every HOT_QUERIES statement with sequential scans disabled and
+    returns (description, expected index, indexes the plan uses) for each.
+    Leaves the connection's transaction rolled back.
+    """
+    results = []
+    connection.execute(text("SET LOCAL enable_seqscan = off"))
+    for description, statement, expected_index in HOT_QUERIES:
+        sql = str(statement.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        raw_plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        plan = (json.loads(raw_plan) if isinstance(raw_plan, str) else raw_plan)[0]["Plan"]
+        results.append((description, expected_index, sorted(set(_index_names(plan)))))
+    connection.rollback()
+    return results
+
+
+def main() -> None:
+    failures = 0
+    with engine.connect() as connection:
+        for description, expected_index, used in check_plans(connection):
+            ok = expected_index in used
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {description}: "
+                  f"expected {expected_index}, plan uses {used or 'no index'}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
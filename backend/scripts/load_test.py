@@ -0,0 +1,92 @@
+"""
+Minimal HTTP load test for comparing endpoint concurrency.
+
+Usage (from the backend directory, against a running server):
+    python -m scripts.load_test --token <access token> \
+        --path /api/v1/exercises/ --path /api/v1/plans/ \
+        --requests 2000 --concurrency 200
+
+    python -m scripts.load_test --token <athlete token> \
+        --post /api/v1/workout-logs/ '{"plan_assignment_id": 1, "plan_exercise_details_id": 1,
+            "sets_performed": 1, "reps_performed_per_set": [5], "weight_used_per_set": ["100kg"],
+            "idempotency_key": "load-$REQUEST"}'
+
+Each path is hammered with the same number of concurrent requests and the
+throughput and latency percentiles are printed side by side. --path sends
+GETs; --post and --put send the given JSON body, with $REQUEST replaced by a
+value unique to each request (for idempotency keys and names), to load the
+write paths (plans, nutrition plans, users, workout logs) as well.
+"""
+import argparse
+import json
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+
+def _send(method: str, url: str, token: str, body: Optional[str]) -> Tuple[bool, float]:
+    headers = {"Authorization": f"Bearer {token}"}
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+    request = urllib.request.Request(
+        url, data=body.encode() if body is not None else None, headers=headers, method=method)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+            ok = response.status == 200
+    except Exception:
+        ok = False
+    return ok, (time.perf_counter() - start) * 1000
+
+
+def run(url: str, token: str, requests: int, concurrency: int,
+        method: str = "GET", body: Optional[str] = None) -> None:
+    # Unique across runs too, so retried runs do not only hit duplicates
+    run_id = f"{time.time_ns():x}"
+
+    def request(index: int) -> Tuple[bool, float]:
+        data = body.replace("$REQUEST", f"{run_id}-{index}") if body is not None else None
+        return _send(method, url, token, data)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        results: List[Tuple[bool, float]] = list(clients.map(request, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency in results)
+    errors = sum(1 for ok, _ in results if not ok)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{method} {url}")
+    print(f"  req/sec: {requests / elapsed:8.1f}   errors: {errors}")
+    print(f"  latency ms  p50 {statistics.median(latencies):7.1f}   p95 {p95:7.1f}   max {latencies[-1]:7.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--path", action="append", default=[], help="GET this path")
+    parser.add_argument("--post", action="append", default=[], nargs=2, metavar=("PATH", "JSON"),
+                        help="POST the JSON body to this path")
+    parser.add_argument("--put", action="append", default=[], nargs=2, metavar=("PATH", "JSON"),
+                        help="PUT the JSON body to this path")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    targets = ([("GET", path, None) for path in args.path]
+               + [("POST", path, body) for path, body in args.post]
+               + [("PUT", path, body) for path, body in args.put])
+    if not targets:
+        parser.error("give at least one --path, --post or --put")
+    for method, path, body in targets:
+        if body is not None:
+            json.loads(body.replace("$REQUEST", "0"))  # fail fast on a malformed body
+        run(args.base_url + path, args.token, args.requests, args.concurrency, method, body)
+
+
+if __name__ == "__main__":
+    main()
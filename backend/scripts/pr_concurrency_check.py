@@ -0,0 +1,104 @@
+"""
+Concurrency stress check for PR detection.
+
+Usage (from the backend directory, against a running server, with an athlete's
+token and one of their plan assignments):
+    python -m scripts.pr_concurrency_check --token <athlete access token> \
+        --assignment-id 1 --plan-exercise-details-id 1 --exercise-id 1 \
+        --logs 500 --concurrency 50
+
+Submits random workout logs for one exercise in parallel, with few distinct
+rep counts so submissions race on the same PR rows, then checks that the
+athlete's PRs equal the serial result: the heaviest weight ever logged per rep
+count. Exits with status 1 on request errors or any lost/lowered PR.
+"""
+import argparse
+import json
+import random
+import sys
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+PRS_PATH = "/api/v1/prs/athlete/me/personal-records"
+LOGS_PATH = "/api/v1/workout-logs/"
+
+
+def _request(url: str, token: str, body: Optional[dict] = None) -> Tuple[Optional[object], str]:
+    """Returns (JSON response, "") or (None, error description)."""
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return json.loads(response.read()), ""
+    except Exception as exc:
+        return None, str(exc)
+
+
+def _prs(base_url: str, token: str, exercise_id: int) -> Dict[int, float]:
+    records, error = _request(base_url + PRS_PATH, token)
+    if error:
+        sys.exit(f"Cannot read PRs: {error}")
+    return {record["reps"]: record["weight"] for record in records
+            if record["exercise_id"] == exercise_id}
+
+
+def _random_log(rng: random.Random, assignment_id: int, details_id: int) -> dict:
+    sets = rng.randint(1, 5)
+    return {
+        "plan_assignment_id": assignment_id,
+        "plan_exercise_details_id": details_id,
+        "sets_performed": sets,
+        "reps_performed_per_set": [rng.randint(1, 5) for _ in range(sets)],
+        "weight_used_per_set": [str(rng.randint(8, 80) * 2.5) for _ in range(sets)],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--assignment-id", type=int, required=True)
+    parser.add_argument("--plan-exercise-details-id", type=int, required=True)
+    parser.add_argument("--exercise-id", type=int, required=True)
+    parser.add_argument("--logs", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    logs: List[dict] = [_random_log(rng, args.assignment_id, args.plan_exercise_details_id)
+                        for _ in range(args.logs)]
+
+    # Serial result: existing PRs merged with the heaviest weight per rep count
+    expected = _prs(args.base_url, args.token, args.exercise_id)
+    for log in logs:
+        for reps, weight in zip(log["reps_performed_per_set"], log["weight_used_per_set"]):
+            expected[reps] = max(expected.get(reps, 0), float(weight))
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as clients:
+        results = list(clients.map(
+            lambda log: _request(args.base_url + LOGS_PATH, args.token, log), logs))
+    errors = Counter(error for _, error in results if error)
+
+    actual = _prs(args.base_url, args.token, args.exercise_id)
+    mismatches = {reps: (expected.get(reps), actual.get(reps))
+                  for reps in set(expected) | set(actual)
+                  if expected.get(reps) != actual.get(reps)}
+
+    print(f"logs submitted: {len(logs)}   errors: {sum(errors.values())}   "
+          f"flagged as PR: {sum(1 for log, _ in results if log and log['new_pr_achieved'])}")
+    for error, count in errors.most_common():
+        print(f"  {count} x {error}")
+    for reps in sorted(mismatches):
+        print(f"  {reps} reps: expected {mismatches[reps][0]}, got {mismatches[reps][1]}")
+    print("PRs match the serial result" if not mismatches else "PR MISMATCH")
+    sys.exit(1 if errors or mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Full rebuild of personal_records and exercise_best_e1rms from the workout logs.
+
+Usage (from the backend directory):
+    python -m scripts.rebuild_prs [--batch-size 200]
+
+PRs and best estimated 1RMs are normally maintained on each create/update/
+delete of a workout log; this recomputes them all, e.g. after bulk SQL imports
+or edits, or after changing E1RM_FORMULA. Each batch of athletes is committed
+on its own, so it can be interrupted and re-run.
+"""
+import argparse
+
+import app.db.base  # noqa: F401  (registers all models)
+from app.core.database import SessionLocal
+from app.crud.crud_e1rm import rebuild_best_e1rms
+from app.crud.crud_pr import REBUILD_BATCH_SIZE, rebuild_prs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE,
+                        help="athletes per committed batch")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    progress = {"changed": 0, "deleted": 0}
+    e1rm_progress = {"stored": 0}
+    try:
+        for progress in rebuild_prs(db, batch_size=args.batch_size):
+            print(f"athletes {progress['athletes_done']}/{progress['athletes_total']}: "
+                  f"{progress['changed']} PRs changed, {progress['deleted']} deleted")
+        for e1rm_progress in rebuild_best_e1rms(db, batch_size=args.batch_size):
+            print(f"athletes {e1rm_progress['athletes_done']}/{e1rm_progress['athletes_total']}: "
+                  f"{e1rm_progress['stored']} best e1RMs stored")
+    finally:
+        db.close()
+    print(f"Rebuild complete: {progress['changed']} PRs changed, {progress['deleted']} deleted, "
+          f"{e1rm_progress['stored']} best e1RMs stored")
+
+
+if __name__ == "__main__":
+    main()
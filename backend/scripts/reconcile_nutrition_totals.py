@@ -0,0 +1,39 @@
+"""
+Reconciliation job for the stored nutrition totals.
+
+Usage (from the backend directory):
+    python -m scripts.reconcile_nutrition_totals [--dry-run]
+
+Meal and plan totals are maintained incrementally by the API; this job
+re-derives them from the food items and repairs any that drifted (e.g. after
+manual SQL edits). With --dry-run it only reports them. Exits with status 1
+if drift was found, so it can also be scheduled as a consistency check.
+"""
+import argparse
+import sys
+
+import app.db.base  # noqa: F401  (registers all models)
+from app.core.database import SessionLocal
+from app.crud.crud_nutrition import reconcile_nutrition_totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report drifted totals without repairing them")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        drifted = reconcile_nutrition_totals(db, repair=not args.dry_run)
+    finally:
+        db.close()
+
+    action = "found" if args.dry_run else "repaired"
+    print(f"Meals {action}: {len(drifted['meals'])} {drifted['meals']}")
+    print(f"Plans {action}: {len(drifted['plans'])} {drifted['plans']}")
+    sys.exit(1 if drifted["meals"] or drifted["plans"] else 0)
+
+
+if __name__ == "__main__":
+    main()
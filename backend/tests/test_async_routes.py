@@ -0,0 +1,21 @@
+import inspect
+
+from fastapi.routing import APIRoute
+
+from app.core.database import get_db, get_read_db
+from app.main import app
+
+
+def _dependency_calls(dependant):
+    for dependency in dependant.dependencies:
+        yield dependency.call
+        yield from _dependency_calls(dependency)
+
+
+def test_async_routes_do_not_open_sync_sessions():
+    offending = [
+        route.path for route in app.routes
+        if isinstance(route, APIRoute) and inspect.iscoroutinefunction(route.endpoint)
+        and {get_db, get_read_db} & set(_dependency_calls(route.dependant))
+    ]
+    assert not offending
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+from app.core.security import PasswordHashingBusy
+from app.routers import auth
+
+
+class FakeSession:
+    def __init__(self, user):
+        self.user = user
+        self.committed = False
+
+    def query(self, model):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        return self.user
+
+    def add(self, obj):
+        pass
+
+    def commit(self):
+        self.committed = True
+
+    def refresh(self, obj):
+        pass
+
+
+def _busy(password):
+    raise PasswordHashingBusy()
+
+
+def test_rehash_is_skipped_when_the_hashing_pool_is_busy(monkeypatch):
+    user = SimpleNamespace(hashed_password="old-hash")
+    db = FakeSession(user)
+    monkeypatch.setattr(auth.settings, "PASSWORD_REHASH_ON_LOGIN", True)
+    monkeypatch.setattr(auth, "verify_password", lambda password, hashed: True)
+    monkeypatch.setattr(auth, "password_needs_rehash", lambda hashed: True)
+    monkeypatch.setattr(auth, "get_password_hash", _busy)
+
+    assert auth.authenticate_user(db, "a@example.com", "secret") is user
+    assert user.hashed_password == "old-hash"
+    assert not db.committed
+
+
+def test_rehash_on_login(monkeypatch):
+    user = SimpleNamespace(hashed_password="old-hash")
+    db = FakeSession(user)
+    monkeypatch.setattr(auth.settings, "PASSWORD_REHASH_ON_LOGIN", True)
+    monkeypatch.setattr(auth, "verify_password", lambda password, hashed: True)
+    monkeypatch.setattr(auth, "password_needs_rehash", lambda hashed: True)
+    monkeypatch.setattr(auth, "get_password_hash", lambda password: "new-hash")
+
+    assert auth.authenticate_user(db, "a@example.com", "secret") is user
+    assert user.hashed_password == "new-hash"
+    assert db.committed
@@ -0,0 +1,69 @@
+from app.core import cache as cache_module
+from app.core.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(monkeypatch, maxsize=3, ttl_seconds=10):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return TTLCache(maxsize, ttl_seconds), clock
+
+
+def test_get_set_and_stats(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("missing", "default") == "default"
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 1, 0.5)
+
+
+def test_entries_expire(monkeypatch):
+    cache, clock = _cache(monkeypatch)
+    cache.set("a", 1)
+    clock.now += 9.9
+    assert cache.get("a") == 1
+    clock.now += 0.1
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_is_evicted(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    for key in "abc":
+        cache.set(key, key)
+    cache.get("a")
+    cache.set("d", "d")
+    assert [cache.get(key) for key in "abcd"] == ["a", None, "c", "d"]
+
+
+def test_none_is_a_cacheable_value(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    missing = object()
+    cache.set("deleted-user", None)
+    assert cache.get("deleted-user", missing) is None
+
+
+def test_pop_and_clear(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.pop("a")
+    cache.pop("unknown")
+    assert cache.get("a") is None and cache.get("b") == 2
+    cache.clear()
+    assert cache.stats()["size"] == 0
+
+
+def test_disabled_cache_stores_nothing(monkeypatch):
+    for maxsize, ttl_seconds in [(0, 10), (3, 0)]:
+        cache, _ = _cache(monkeypatch, maxsize, ttl_seconds)
+        cache.set("a", 1)
+        assert cache.get("a") is None
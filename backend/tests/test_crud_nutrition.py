@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.crud.crud_nutrition import apply_macro_delta, macro_delta, macro_totals
+from app.models.nutrition_plan import FoodItem, Meal, NutritionPlan
+from app.models.user import User, UserRole
+
+
+def _food(calories, protein, carbs, fats):
+    return SimpleNamespace(calories=calories, protein=protein, carbs=carbs, fats=fats)
+
+
+def test_macro_totals():
+    assert macro_totals([_food(100, 10, 5, 2), _food(50, 1, 10, 0)]) == {
+        "total_calories": 150, "total_protein": 11, "total_carbs": 15, "total_fats": 2}
+
+
+def test_macro_delta():
+    old, new = _food(100, 10, 5, 2), _food(150, 10, 0, 4)
+    assert macro_delta(new=new) == {"calories": 150, "protein": 10, "carbs": 0, "fats": 4}
+    assert macro_delta(old=old) == {"calories": -100, "protein": -10, "carbs": -5, "fats": -2}
+    assert macro_delta(new=new, old=old) == {"calories": 50, "protein": 0, "carbs": -5, "fats": 2}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, NutritionPlan.__table__, Meal.__table__, FoodItem.__table__])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_apply_macro_delta_treats_null_totals_as_zero(db):
+    coach = User(email="coach@example.com", hashed_password="x", role=UserRole.COACH)
+    db.add(coach)
+    db.flush()
+    plan = NutritionPlan(name="plan", created_by_user_id=coach.id, total_calories=None,
+                         total_protein=None, total_carbs=None, total_fats=None)
+    db.add(plan)
+    db.flush()
+    meal = Meal(nutrition_plan_id=plan.id, name="lunch", time="12:00", order_in_plan=0,
+                total_calories=200, total_protein=None, total_carbs=None, total_fats=None)
+    db.add(meal)
+    db.commit()
+
+    apply_macro_delta(db, macro_delta(new=_food(100, 10, 5, 2)), plan_id=plan.id, meal_id=meal.id)
+    db.commit()
+    db.refresh(plan)
+    db.refresh(meal)
+
+    assert (meal.total_calories, meal.total_protein, meal.total_carbs, meal.total_fats) == (300, 10, 5, 2)
+    assert (plan.total_calories, plan.total_protein, plan.total_carbs, plan.total_fats) == (100, 10, 5, 2)
@@ -0,0 +1,326 @@
+import datetime
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.crud import crud_pr, crud_workout_sets
+from app.crud.crud_pr import best_lifts_for_logs, best_weight_per_reps, rep_max_curves
+# app.db.base registers every model, which the mappers need to configure
+from app.db.base import (
+    Exercise, PersonalRecord, PersonalRecordHistory, Plan, PlanAssignment,
+    PlanExerciseDetails, User, WorkoutLog, WorkoutSet,
+)
+from app.models.plan import PlanDifficulty
+from app.models.user import UserRole
+
+
+def _log(id, sets, reps, weights, day=1):
+    return SimpleNamespace(id=id, sets_performed=sets, reps_performed_per_set=reps,
+                           weight_kg_per_set=weights,
+                           date_performed=datetime.datetime(2024, 1, day, 18, 30))
+
+
+def test_best_weight_per_reps_keeps_the_heaviest_set():
+    assert best_weight_per_reps([5, 5, 3], [80, 85, 90]) == {5: 85, 3: 90}
+
+
+def test_best_weight_per_reps_ignores_invalid_sets():
+    assert best_weight_per_reps([5, 0, 3, 8], [None, 100, 0, -10]) == {}
+
+
+def test_best_lifts_for_logs():
+    lifts = best_lifts_for_logs([
+        (_log(1, 2, [5, 3], [80, 90], day=1), 7),
+        (_log(2, 1, [5], [85], day=2), 7),
+        # ties keep the first log
+        (_log(3, 1, [3], [90], day=3), 7),
+        (_log(4, 1, [5], [60], day=4), 8),
+    ])
+    assert lifts == {
+        (7, 5): (85, datetime.date(2024, 1, 2), 2),
+        (7, 3): (90, datetime.date(2024, 1, 1), 1),
+        (8, 5): (60, datetime.date(2024, 1, 4), 4),
+    }
+
+
+def test_best_lifts_for_logs_skips_mismatched_logs():
+    assert best_lifts_for_logs([
+        (_log(1, 2, [5], [100]), 7),
+        (_log(2, 1, [5], [100, 100]), 7),
+        (_log(3, 1, [5], None), 7),
+    ]) == {}
+
+
+def _history(id, exercise_id, reps, weight):
+    return SimpleNamespace(id=id, exercise_id=exercise_id, reps=reps, weight=weight)
+
+
+def test_rep_max_curves():
+    # ordered by exercise, reps and id, as get_pr_history_async returns them
+    rows = [
+        _history(1, 7, 1, 100), _history(4, 7, 1, 110),
+        _history(2, 7, 5, 80),
+        _history(3, 8, 3, 60),
+    ]
+    curves = rep_max_curves([(rows[0], 120.0), (rows[1], 120.0), (rows[2], 120.0), (rows[3], None)])
+    assert [curve["exercise_id"] for curve in curves] == [7, 8]
+    assert curves[0]["best_e1rm"] == 120.0 and curves[1]["best_e1rm"] is None
+    assert [(row.reps, row.weight) for row in curves[0]["curve"]] == [(1, 110), (5, 80)]
+    # the timeline is in recording order, across rep counts
+    assert [row.id for row in curves[0]["timeline"]] == [1, 2, 4]
+    assert [row.id for row in curves[1]["timeline"]] == [3]
+
+
+def test_rep_max_curves_removed_and_re_added_record():
+    removed = [_history(1, 7, 3, 90), _history(2, 7, 3, None)]
+    curve, = rep_max_curves([(row, None) for row in removed])
+    assert curve["curve"] == []
+    assert [row.weight for row in curve["timeline"]] == [90, None]
+
+    re_added = removed + [_history(5, 7, 3, 85)]
+    curve, = rep_max_curves([(row, None) for row in re_added])
+    assert [(row.id, row.weight) for row in curve["curve"]] == [(5, 85)]
+    assert [row.weight for row in curve["timeline"]] == [90, None, 85]
+
+
+def test_rep_max_curves_without_history():
+    assert rep_max_curves([]) == []
+
+
+@pytest.fixture
+def pr_athletes():
+    """Two athletes and an exercise in the TEST_DATABASE_URL database, removed afterwards."""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    coach = User(email=f"pr-coach-{uuid.uuid4().hex}@example.com", hashed_password="x",
+                 role=UserRole.COACH)
+    db.add(coach)
+    db.flush()
+    athletes = [User(email=f"pr-athlete-{uuid.uuid4().hex}@example.com", hashed_password="x",
+                     role=UserRole.ATHLETE, coach_id=coach.id) for _ in range(2)]
+    exercises = [Exercise(name=f"Lift {i}", muscle_group="legs", created_by_user_id=coach.id)
+                 for i in range(2)]
+    db.add_all(athletes + exercises)
+    db.commit()
+    user_ids = [coach.id] + [athlete.id for athlete in athletes]
+    yield [athlete.id for athlete in athletes], [exercise.id for exercise in exercises]
+    for model in (PersonalRecordHistory, PersonalRecord):
+        db.query(model).filter(model.athlete_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(Exercise).filter(Exercise.created_by_user_id == coach.id).delete(synchronize_session=False)
+    db.query(User).filter(User.id.in_(user_ids[1:])).delete(synchronize_session=False)
+    db.query(User).filter(User.id == coach.id).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+
+def _final_prs(athlete_id):
+    from app.core.database import SessionLocal
+
+    with SessionLocal() as db:
+        return {(pr.exercise_id, pr.reps): pr.weight
+                for pr in db.query(PersonalRecord).filter(PersonalRecord.athlete_id == athlete_id)}
+
+
+@pytest.mark.postgres
+def test_parallel_upserts_match_serial_result(pr_athletes):
+    from app.core.database import SessionLocal
+
+    (serial_athlete, parallel_athlete), exercise_ids = pr_athletes
+    rng = random.Random(18)
+    submissions = [
+        (rng.choice(exercise_ids),
+         {reps: rng.choice(range(40, 160, 5)) for reps in rng.sample(range(1, 9), 4)})
+        for _ in range(40)
+    ]
+    today = datetime.date.today()
+
+    def submit(athlete_id, exercise_id, best_weights, barrier=None):
+        with SessionLocal() as db:
+            if barrier is not None:
+                barrier.wait()
+            crud_pr.upsert_prs(db, athlete_id=athlete_id, exercise_id=exercise_id,
+                               best_weights=best_weights, date_achieved=today)
+            db.commit()
+
+    for exercise_id, best_weights in submissions:
+        submit(serial_athlete, exercise_id, best_weights)
+
+    workers = 8
+    barrier = threading.Barrier(workers)
+    with ThreadPoolExecutor(workers) as pool:
+        for start in range(0, len(submissions), workers):
+            futures = [pool.submit(submit, parallel_athlete, exercise_id, best_weights, barrier)
+                       for exercise_id, best_weights in submissions[start:start + workers]]
+            for future in futures:
+                future.result()
+
+    expected = {}
+    for exercise_id, best_weights in submissions:
+        for reps, weight in best_weights.items():
+            expected[(exercise_id, reps)] = max(weight, expected.get((exercise_id, reps), 0))
+    assert _final_prs(serial_athlete) == expected
+    assert _final_prs(parallel_athlete) == expected
+
+
+@pytest.fixture(params=[False, True], ids=["workout_logs", "workout_sets"])
+def lifter(request, monkeypatch):
+    """
+    A session, an athlete with one assigned exercise and helpers that log,
+    correct and delete workouts the way the workout log routes do, with PRs
+    recomputed from the logs and, with WORKOUT_SETS_DUAL_WRITE, from workout_sets.
+    Everything is removed afterwards.
+    """
+    from app.core.database import SessionLocal
+
+    monkeypatch.setattr(settings, "WORKOUT_SETS_DUAL_WRITE", request.param)
+
+    db = SessionLocal()
+    coach = User(email=f"pr-coach-{uuid.uuid4().hex}@example.com", hashed_password="x",
+                 role=UserRole.COACH)
+    db.add(coach)
+    db.flush()
+    athlete = User(email=f"pr-athlete-{uuid.uuid4().hex}@example.com", hashed_password="x",
+                   role=UserRole.ATHLETE, coach_id=coach.id)
+    exercise = Exercise(name="Squat", muscle_group="legs", created_by_user_id=coach.id)
+    plan = Plan(name="PR plan", difficulty_level=PlanDifficulty.BEGINNER, created_by_user_id=coach.id)
+    db.add_all([athlete, exercise, plan])
+    db.flush()
+    details = PlanExerciseDetails(plan_id=plan.id, exercise_id=exercise.id, sets="3", reps="5",
+                                  rest_time_seconds=90, order_in_plan=1)
+    assignment = PlanAssignment(plan_id=plan.id, athlete_id=athlete.id, assigned_by_coach_id=coach.id)
+    db.add_all([details, assignment])
+    db.commit()
+
+    def log(reps, weights, day):
+        workout_log = WorkoutLog(
+            plan_assignment_id=assignment.id, plan_exercise_details_id=details.id,
+            athlete_id=athlete.id, date_performed=datetime.datetime(2024, 1, day, 18, 30),
+            sets_performed=len(reps), reps_performed_per_set=reps,
+            weight_used_per_set=[str(weight) for weight in weights])
+        db.add(workout_log)
+        db.flush()
+        crud_workout_sets.write_sets(db, [(workout_log, exercise.id)])
+        crud_pr.upsert_prs_batch(db, athlete_id=athlete.id,
+                                 lifts=crud_pr.best_lifts_for_logs([(workout_log, exercise.id)]))
+        db.commit()
+        return workout_log
+
+    def correct(workout_log, reps, weights):
+        workout_log.sets_performed = len(reps)
+        workout_log.reps_performed_per_set = reps
+        workout_log.weight_used_per_set = [str(weight) for weight in weights]
+        crud_workout_sets.replace_sets(db, workout_log)
+        db.flush()
+        crud_pr.recompute_prs_for_log(db, workout_log)
+        crud_pr.upsert_prs_batch(db, athlete_id=athlete.id,
+                                 lifts=crud_pr.best_lifts_for_logs([(workout_log, exercise.id)]))
+        db.commit()
+
+    def delete(workout_log):
+        crud_pr.recompute_prs_for_log(db, workout_log, deleting=True)
+        db.delete(workout_log)
+        db.commit()
+
+    def prs():
+        """reps -> (weight, workout_log_id) of the athlete's PRs."""
+        return {pr.reps: (pr.weight, pr.workout_log_id) for pr in db.query(PersonalRecord).filter(
+            PersonalRecord.athlete_id == athlete.id).populate_existing()}
+
+    def history():
+        """(reps, weight, workout_log_id) of the athlete's PR history, in recording order."""
+        return [(row.reps, row.weight, row.workout_log_id) for row in db.query(PersonalRecordHistory).filter(
+            PersonalRecordHistory.athlete_id == athlete.id).order_by(PersonalRecordHistory.id)]
+
+    yield SimpleNamespace(db=db, athlete_id=athlete.id, log=log, correct=correct, delete=delete,
+                          prs=prs, history=history)
+
+    db.rollback()
+    for model in (PersonalRecordHistory, PersonalRecord, WorkoutSet, WorkoutLog):
+        db.query(model).filter(model.athlete_id == athlete.id).delete(synchronize_session=False)
+    db.query(PlanAssignment).filter(PlanAssignment.id == assignment.id).delete(synchronize_session=False)
+    db.query(PlanExerciseDetails).filter(PlanExerciseDetails.id == details.id).delete(synchronize_session=False)
+    db.query(Plan).filter(Plan.id == plan.id).delete(synchronize_session=False)
+    db.query(Exercise).filter(Exercise.id == exercise.id).delete(synchronize_session=False)
+    db.query(User).filter(User.id == athlete.id).delete(synchronize_session=False)
+    db.query(User).filter(User.id == coach.id).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+
+@pytest.mark.postgres
+def test_correction_lowering_a_pr_falls_back_to_the_next_best_log(lifter):
+    first = lifter.log([5, 3], [100, 110], day=1)
+    second = lifter.log([5], [90], day=2)
+    assert lifter.prs() == {5: (100, first.id), 3: (110, first.id)}
+
+    lifter.correct(first, [5, 3], [80, 110])
+    assert lifter.prs() == {5: (90, second.id), 3: (110, first.id)}
+    assert lifter.history()[-1] == (5, 90, second.id)
+
+
+@pytest.mark.postgres
+def test_correction_raising_a_pr(lifter):
+    first = lifter.log([5], [100], day=1)
+    second = lifter.log([5], [90], day=2)
+
+    lifter.correct(second, [5], [120])
+    assert lifter.prs() == {5: (120, second.id)}
+    # lowering it again hands the PR back to the first log
+    lifter.correct(second, [5], [95])
+    assert lifter.prs() == {5: (100, first.id)}
+    assert [weight for reps, weight, _ in lifter.history()] == [100, 120, 100]
+
+
+@pytest.mark.postgres
+def test_delete_falls_back_to_the_earliest_of_tied_logs(lifter):
+    first = lifter.log([5], [100], day=1)
+    second = lifter.log([5], [100], day=2)
+    lifter.log([5], [100], day=3)
+    assert lifter.prs() == {5: (100, first.id)}
+
+    lifter.delete(first)
+    assert lifter.prs() == {5: (100, second.id)}
+
+
+@pytest.mark.postgres
+def test_deleting_the_only_log_removes_the_pr(lifter):
+    only = lifter.log([5, 1], [100, 120], day=1)
+
+    lifter.delete(only)
+    assert lifter.prs() == {}
+    assert sorted(lifter.history()[-2:]) == [(1, None, None), (5, None, None)]
+
+
+@pytest.mark.postgres
+def test_rebuild_matches_incremental_maintenance(lifter):
+    rng = random.Random(23)
+    # Distinct weights, so every PR has a single possible holder
+    weights = iter(rng.sample(range(20, 400), 300))
+
+    def sets():
+        reps = rng.sample(range(1, 9), rng.randint(1, 4))
+        return reps, [next(weights) for _ in reps]
+
+    logs = []
+    for day in range(1, 29):
+        action = rng.random()
+        if logs and action < 0.25:
+            lifter.correct(rng.choice(logs), *sets())
+        elif logs and action < 0.4:
+            lifter.delete(logs.pop(rng.randrange(len(logs))))
+        else:
+            logs.append(lifter.log(*sets(), day=day))
+
+    incremental, recorded = lifter.prs(), len(lifter.history())
+    assert incremental
+    for _ in crud_pr.rebuild_prs(lifter.db):
+        pass
+    assert lifter.prs() == incremental
+    # nothing was out of date, so the rebuild recorded no changes
+    assert len(lifter.history()) == recorded
@@ -0,0 +1,71 @@
+import datetime
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.crud.crud_e1rm import (
+    E1RM_MAX_REPS, best_e1rm_per_log, best_e1rms_for_logs, estimate_1rm,
+)
+
+
+def _log(id, sets, reps, weights, day=1):
+    return SimpleNamespace(id=id, sets_performed=sets, reps_performed_per_set=reps,
+                           weight_kg_per_set=weights,
+                           date_performed=datetime.datetime(2024, 1, day, 18, 30))
+
+
+@pytest.mark.parametrize("formula, expected", [
+    ("epley", 113.33), ("brzycki", 109.09), ("lombardi", 114.87),
+])
+def test_estimate_1rm_formulas(formula, expected):
+    assert estimate_1rm([100], [4], formula)[0] == pytest.approx(expected, abs=0.01)
+
+
+def test_single_rep_is_its_own_1rm():
+    for formula in ("epley", "brzycki", "lombardi"):
+        assert estimate_1rm([100], [1], formula)[0] == 100
+
+
+def test_invalid_sets_give_nan():
+    estimates = estimate_1rm([None, 0, 100, 100, 100], [5, 5, 0, E1RM_MAX_REPS + 1, E1RM_MAX_REPS],
+                             "epley")
+    assert np.isnan(estimates[:4]).all()
+    assert not math.isnan(estimates[4])
+
+
+def test_unknown_formula():
+    with pytest.raises(ValueError):
+        estimate_1rm([100], [5], "wathan")
+
+
+def test_best_e1rm_per_log():
+    best = best_e1rm_per_log(
+        [[1, 5], [3], [], [5, 5]],
+        [[100, 90], [None], [], [80]],
+        "epley"
+    )
+    assert best[0] == pytest.approx(105)
+    # no valid set, no sets, mismatched lengths
+    assert np.isnan(best[1:]).all()
+
+
+def test_best_e1rm_per_log_without_logs():
+    assert best_e1rm_per_log([], [], "epley").shape == (0,)
+
+
+def test_best_e1rms_for_logs_keeps_the_first_log_on_ties(monkeypatch):
+    monkeypatch.setattr("app.crud.crud_e1rm.settings.E1RM_FORMULA", "epley")
+    bests = best_e1rms_for_logs([
+        (_log(1, 1, [1], [100], day=1), 7),
+        (_log(2, 1, [1], [100], day=2), 7),
+        (_log(3, 2, [3, 3], [50, 60], day=3), 8),
+        # sets_performed does not match the per-set lists
+        (_log(4, 2, [1], [200], day=4), 7),
+        (_log(5, 1, [1], None, day=5), 7),
+    ])
+    assert bests == {
+        7: (100.0, datetime.date(2024, 1, 1), 1),
+        8: (66.0, datetime.date(2024, 1, 3), 3),
+    }
@@ -0,0 +1,23 @@
+from fastapi.testclient import TestClient
+
+from app.core.database import get_db
+from app.main import app
+
+
+class BrokenSession:
+    def execute(self, statement):
+        raise ConnectionError("database is down")
+
+
+def test_db_health_is_503_when_the_database_is_unreachable():
+    app.dependency_overrides[get_db] = lambda: BrokenSession()
+    try:
+        response = TestClient(app).get("/health/db")
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+
+
+def test_pool_stats_need_authentication():
+    assert TestClient(app).get("/health/db/pools").status_code == 401
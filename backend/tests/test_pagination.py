@@ -0,0 +1,39 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.workout_log import WorkoutLog
+
+KEY = (WorkoutLog.date_performed, WorkoutLog.id)
+
+
+def _raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def test_round_trip():
+    values = [datetime(2024, 5, 1, 12, 30, 15, 123456), 42]
+    assert decode_cursor(encode_cursor(values), KEY) == values
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    _raw_cursor({"date": "2024-01-01T00:00:00", "id": 1}),
+    _raw_cursor(["2024-01-01T00:00:00"]),
+    _raw_cursor(["2024-01-01T00:00:00", "abc"]),
+    _raw_cursor(["2024-01-01T00:00:00", 1.5]),
+    _raw_cursor(["2024-01-01T00:00:00", True]),
+    _raw_cursor(["2024-01-01T00:00:00", {"id": 1}]),
+    _raw_cursor(["2024-01-01T00:00:00", None]),
+    _raw_cursor([1704067200, 1]),
+    _raw_cursor(["yesterday", 1]),
+])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, KEY)
+    assert exc_info.value.status_code == 400
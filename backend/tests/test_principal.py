@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.principal import (
+    UserPrincipal,
+    check_user_status,
+    invalidate_user,
+    status_cache,
+)
+from app.models.user import User, UserRole
+
+
+def test_from_claims():
+    principal = UserPrincipal.from_claims(
+        {"sub": "a@example.com", "uid": "7", "role": "coach", "coach_id": None})
+    assert principal == UserPrincipal(id=7, email="a@example.com", role=UserRole.COACH,
+                                      is_active=True, coach_id=None)
+
+
+@pytest.mark.parametrize("payload", [
+    {"sub": "a@example.com", "role": "coach"},
+    {"sub": "a@example.com", "uid": "x", "role": "coach"},
+    {"sub": "a@example.com", "uid": 7, "role": "superuser"},
+])
+def test_from_claims_rejects_incomplete_tokens(payload):
+    assert UserPrincipal.from_claims(payload) is None
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    session = sessionmaker(bind=engine)()
+    status_cache.clear()
+    yield session
+    status_cache.clear()
+    session.close()
+    engine.dispose()
+
+
+def test_status_check_overrides_stale_claims(db):
+    coach = User(email="coach@example.com", hashed_password="x", role=UserRole.COACH)
+    db.add(coach)
+    db.flush()
+    athlete = User(email="athlete@example.com", hashed_password="x", role=UserRole.ATHLETE,
+                   is_active=True, coach_id=coach.id)
+    db.add(athlete)
+    db.commit()
+    # Token issued before the athlete was promoted and moved away from the coach
+    principal = UserPrincipal.from_user(athlete)
+    athlete.role, athlete.coach_id = UserRole.COACH, None
+    db.commit()
+
+    check_user_status(db, athlete.id).apply_to(principal)
+    assert (principal.role, principal.coach_id, principal.is_active) == (UserRole.COACH, None, True)
+
+
+def test_status_is_cached_until_invalidated(db):
+    user = User(email="athlete@example.com", hashed_password="x", role=UserRole.ATHLETE, is_active=True)
+    db.add(user)
+    db.commit()
+    assert check_user_status(db, user.id).is_active
+
+    user.is_active = False
+    db.commit()
+    assert check_user_status(db, user.id).is_active
+    invalidate_user(user_id=user.id)
+    assert not check_user_status(db, user.id).is_active
+
+    db.query(User).filter(User.id == user.id).delete()
+    db.commit()
+    invalidate_user(user_id=user.id)
+    assert check_user_status(db, user.id) is None
@@ -0,0 +1,151 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base, get_async_db, get_async_read_db
+from app.core.principal import principal_cache
+from app.core.query_budget import QueryBudgetExceeded, query_budget
+from app.core.security import access_token_claims, create_access_token
+from app.main import app
+from app.models.exercise import Exercise
+from app.models.nutrition_plan import FoodItem, Meal, NutritionPlan, NutritionPlanAssignment
+from app.models.plan import Plan, PlanAssignment, PlanDifficulty, PlanExerciseDetails
+from app.models.user import User, UserRole
+from app.routers import nutrition_plans as nutrition_plans_router
+from app.routers import plans as plans_router
+
+NUM_PLANS = 5
+MEALS_PER_PLAN = 3
+FOOD_ITEMS_PER_MEAL = 4
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    return tmp_path / "budget.db"
+
+
+@pytest.fixture
+def session_factory(database_path):
+    # Seeds the file database the async sessions of the app read
+    engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, Exercise.__table__, Plan.__table__,
+        PlanExerciseDetails.__table__, PlanAssignment.__table__, NutritionPlan.__table__,
+        Meal.__table__, FoodItem.__table__, NutritionPlanAssignment.__table__])
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory, database_path, monkeypatch):
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    async_session_factory = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    monkeypatch.setattr(settings, "QUERY_BUDGET_STRICT", True)
+    principal_cache.clear()
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    # Server errors (QueryBudgetExceeded) are raised in the test
+    with TestClient(app) as test_client:
+        yield test_client
+        app.dependency_overrides.clear()
+        test_client.portal.call(async_engine.dispose)
+    principal_cache.clear()
+
+
+@pytest.fixture
+def coach_headers(session_factory):
+    db = session_factory()
+    coach = User(email="coach@example.com", hashed_password="x", role=UserRole.COACH, is_active=True)
+    db.add(coach)
+    db.flush()
+    exercises = [Exercise(name=f"exercise {i}", muscle_group="legs", created_by_user_id=coach.id)
+                 for i in range(3)]
+    db.add_all(exercises)
+    db.flush()
+    for i in range(NUM_PLANS):
+        plan = Plan(name=f"plan {i}", difficulty_level=PlanDifficulty.BEGINNER,
+                    created_by_user_id=coach.id)
+        db.add(plan)
+        db.flush()
+        db.add_all([PlanExerciseDetails(plan_id=plan.id, exercise_id=exercise.id, sets="3",
+                                        reps="8", rest_time_seconds=60, order_in_plan=order)
+                    for order, exercise in enumerate(exercises)])
+        db.add(NutritionPlan(name=f"nutrition plan {i}", created_by_user_id=coach.id, meals=[
+            Meal(name=f"meal {m}", time=f"0{m + 7}:00", order_in_plan=m, food_items=[
+                FoodItem(name=f"food {f}", quantity="100g", calories=100, protein=10,
+                         carbs=10, fats=2, order_in_meal=f)
+                for f in range(FOOD_ITEMS_PER_MEAL)])
+            for m in range(MEALS_PER_PLAN)]))
+    db.commit()
+    token = create_access_token(data=access_token_claims(coach))
+    db.close()
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_read_plans_within_budget(client, coach_headers):
+    response = client.get("/api/v1/plans/", headers=coach_headers)
+    assert response.status_code == 200
+    plans = response.json()
+    assert len(plans) == NUM_PLANS
+    assert all(len(plan["exercise_details"]) == 3 for plan in plans)
+
+
+def test_update_plan_within_budget(client, coach_headers):
+    plan_id = client.get("/api/v1/plans/", headers=coach_headers).json()[0]["id"]
+    response = client.put(f"/api/v1/plans/{plan_id}", json={"name": "renamed"},
+                          headers=coach_headers)
+    assert response.status_code == 200
+    assert response.json()["name"] == "renamed"
+    assert len(response.json()["exercise_details"]) == 3
+
+
+def test_extra_load_of_details_exceeds_budget(client, coach_headers, monkeypatch):
+    # One more batched load than budgeted (the details' exercises) fails the request
+    monkeypatch.setattr(plans_router, "_plans_with_details", lambda: select(Plan).options(
+        selectinload(Plan.exercise_details).selectinload(PlanExerciseDetails.exercise)))
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/api/v1/plans/", headers=coach_headers)
+
+
+def test_read_nutrition_plans_within_budget(client, coach_headers):
+    response = client.get("/api/v1/nutrition-plans/", headers=coach_headers)
+    assert response.status_code == 200
+    plans = response.json()
+    assert len(plans) == NUM_PLANS
+    assert all(len(plan["meals"]) == MEALS_PER_PLAN for plan in plans)
+    assert all(len(meal["food_items"]) == FOOD_ITEMS_PER_MEAL
+               for plan in plans for meal in plan["meals"])
+
+
+def test_extra_load_of_meals_exceeds_budget(client, coach_headers, monkeypatch):
+    # One more batched load than budgeted (the plans' assignments) fails the request
+    monkeypatch.setattr(nutrition_plans_router, "_nutrition_plans_with_meals", lambda: select(
+        NutritionPlan).options(selectinload(NutritionPlan.meals).selectinload(Meal.food_items),
+                               selectinload(NutritionPlan.assignments)))
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/api/v1/nutrition-plans/", headers=coach_headers)
+
+
+def test_strict_budget_fails_the_request(client, session_factory):
+    budget_app = FastAPI()
+
+    @budget_app.get("/two-queries", dependencies=[Depends(query_budget(1))])
+    def two_queries():
+        with session_factory() as db:
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT 2"))
+        return {}
+
+    with TestClient(budget_app) as budget_client:
+        with pytest.raises(QueryBudgetExceeded):
+            budget_client.get("/two-queries")
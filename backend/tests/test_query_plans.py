@@ -0,0 +1,17 @@
+import pytest
+
+from app.core.database import engine
+from scripts.check_query_plans import HOT_QUERIES, check_plans
+
+
+# The planner's choice depends on the database's statistics: run against the
+# dedicated, freshly migrated TEST_DATABASE_URL database rather than one
+# holding data of its own.
+@pytest.mark.postgres
+def test_hot_queries_use_their_indexes():
+    with engine.connect() as connection:
+        results = check_plans(connection)
+    assert len(results) == len(HOT_QUERIES)
+    misses = [(description, expected_index, used)
+              for description, expected_index, used in results if expected_index not in used]
+    assert not misses
@@ -0,0 +1,35 @@
+import pytest
+
+from app.core.units import KG_PER_LB, MAX_WEIGHT_KG, parse_weight_kg, weights_to_kg
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("50", 50.0),
+    ("52.5", 52.5),
+    ("52,5", 52.5),
+    (" 60 kg ", 60.0),
+    ("60KGS", 60.0),
+    ("100 lbs", round(100 * KG_PER_LB, 2)),
+    ("99999.99", 99999.99),
+])
+def test_parse_weight_kg(value, expected):
+    assert parse_weight_kg(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "bodyweight", "-5", "5 stone", "1e3", "100000", "1000000",
+                                   "220463 lb"])
+def test_parse_weight_kg_rejects(value):
+    with pytest.raises(ValueError):
+        parse_weight_kg(value)
+
+
+def test_max_weight_matches_rounding():
+    # Rounds up to the bound, so it would overflow NUMERIC(7, 2)
+    with pytest.raises(ValueError):
+        parse_weight_kg(f"{MAX_WEIGHT_KG - 0.001}")
+
+
+def test_weights_to_kg():
+    assert weights_to_kg(["50", "x", "10 lb", "1000000"]) == [50.0, None, 4.54, None]
+    assert weights_to_kg([]) == []
+    assert weights_to_kg(None) is None
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.workout_log import WorkoutLogCreate, WorkoutLogSyncItem, WorkoutLogUpdate
+
+
+def _log(**overrides):
+    return dict(dict(plan_assignment_id=1, plan_exercise_details_id=1, sets_performed=2,
+                     reps_performed_per_set=[5, 5], weight_used_per_set=["100", "100"]), **overrides)
+
+
+def test_create_rejects_weights_beyond_column_precision():
+    with pytest.raises(ValidationError):
+        WorkoutLogCreate(**_log(weight_used_per_set=["100", "1000000"]))
+
+
+def test_create_rejects_misaligned_sets():
+    with pytest.raises(ValidationError):
+        WorkoutLogCreate(**_log(reps_performed_per_set=[5]))
+
+
+@pytest.mark.parametrize("field", ["sets_performed", "reps_performed_per_set", "weight_used_per_set"])
+def test_update_rejects_null_for_required_columns(field):
+    with pytest.raises(ValidationError):
+        WorkoutLogUpdate(**{field: None})
+
+
+def test_update_allows_omitted_and_nullable_fields():
+    update = WorkoutLogUpdate(athlete_notes=None)
+    assert update.dict(exclude_unset=True) == {"athlete_notes": None}
+
+
+def _sync_item(**overrides):
+    return WorkoutLogSyncItem(**_log(idempotency_key="queued-1", **overrides))
+
+
+def test_sync_item_performed_at_is_naive_utc():
+    performed_at = datetime(2024, 5, 1, 9, 30, tzinfo=timezone(timedelta(hours=2)))
+    assert _sync_item(performed_at=performed_at).performed_at == datetime(2024, 5, 1, 7, 30)
+    assert _sync_item(performed_at="2024-05-01T07:30:00").performed_at == datetime(2024, 5, 1, 7, 30)
+    assert _sync_item().performed_at is None
+
+
+def test_sync_item_rejects_future_performed_at():
+    with pytest.raises(ValidationError):
+        _sync_item(performed_at=datetime.utcnow() + timedelta(hours=1))
+    # Within the tolerated clock skew
+    assert _sync_item(performed_at=datetime.utcnow() + timedelta(minutes=1)).performed_at